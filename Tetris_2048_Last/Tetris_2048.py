@@ -4,21 +4,25 @@
 #                                                                              #
 ################################################################################
 
-import numpy as np
 import lib.stddraw as stddraw # for creating an animation with user interactions
 from lib.picture import Picture  # used for displaying an image on the game menu
 from lib.color import Color  # used for coloring the game menu
-import random  # used for creating tetrominoes with random types (shapes)
-from game_grid import GameGrid  # the class for modeling the game grid
-from tetromino import Tetromino  # the class for modeling the tetrominoes
+from game_engine import GameEngine  # the class for running the game rules
+from replay import ReplayRecorder  # used for recording the game
+from autoplayer import AutoPlayer  # used for playing the game automatically
 
 import os
+import sys
+import time  # used for running the game loop at a fixed rate
 
 
 # Created a class
 class Game:
-    # Main function where this program starts execution
-    def start(self):    
+    # Main function where this program starts execution, the inputs of the
+    # game are recorded into the file with the name record_file (see replay.py)
+    # if it is not None and the game plays itself without the menus if
+    # autoplay is True (see autoplayer.py)
+    def start(self, record_file=None, autoplay=False):    
         # set the dimensions of the game grid
         grid_h, grid_w = 20, 20
         # grids for whole table, this game_w is for excld. next tetromino's part
@@ -30,26 +34,26 @@ class Game:
         stddraw.setXscale(-0.5, grid_w - 0.5)
         stddraw.setYscale(-0.5, grid_h - 0.5)
 
-        # An empty list to store the next 10 tetrominos.
-        self.tetrominos = list()
-        # # of rounds
-        self.round_count = 0
-        # Generate 10 tetrominos and store to the array.
-        self.create_tetromino(grid_h, game_w)
-
-        # Store next type
-        self.next_type = self.tetrominos[self.round_count + 1]
-        # Show to the user what the next tetromino is.
-        self.next_type.move_pos(15, 15)
-
-        # create the game grid
-        grid = GameGrid(grid_h, grid_w)
-
-        # create the first tetromino to enter the game grid
-        # by using the create_tetromino function defined below
-        current_tetromino = self.tetrominos[self.round_count]
-        # To draw first tetromino
-        grid.current_tetromino = current_tetromino
+        # create the engine that runs the rules of the game on the game grid
+        self.engine = GameEngine(grid_h, grid_w, game_w, preview_depth=3)
+        grid = self.engine.grid
+        # the seed of the game, the same game can be played again with it
+        print("Seed:", self.engine.seed)
+        self.autoplayer = AutoPlayer() if autoplay else None
+        self.recorder = None
+        if record_file is not None:
+            self.recorder = ReplayRecorder(record_file, self.engine)
+        try:
+            self.run(grid_h, grid_w, grid)
+        finally:
+            # end the replay file when the window is closed
+            if self.recorder is not None:
+                self.recorder.close(self.engine.tick_count)
+
+    # Runs the game until the window is closed
+    def run(self, grid_h, grid_w, grid):
+        # Show to the user what the next tetrominoes are.
+        self.show_preview()
 
         # Game restart
         self.restart = False
@@ -59,14 +63,27 @@ class Game:
         self.is_finished = False
         # Game over
         self.game_over = False
+        # the image displayed on the menus (loaded when first displayed)
+        self.menu_picture = None
 
         # display a simple menu before opening the game
         # by using the display_game_menu function defined below
-        self.display_game_menu(grid_h, grid_w, grid)
+        if self.autoplayer is None:
+            self.display_game_menu(grid_h, grid_w, grid)
+        # the game is advanced in fixed ticks of simulated time (tick_ms) that
+        # are taken from the real time passed, so the speed of the game does
+        # not depend on how long drawing a frame takes, and it is drawn once
+        # per frame of frame_ms
+        frame_ms = 1000 / 60
+        # the real time (in ms) that is not simulated yet (capped so that the
+        # game does not run many ticks at once after a long stall)
+        accumulator = 0
+        max_accumulator = 250
+        last_time = time.perf_counter()
+        # the actions waiting for the next tick
+        actions = []
         # the main game loop
         while True:
-            # To draw following tetromino
-            grid.set_next(self.tetrominos[self.round_count + 1])
             # If the user click the stop button
             if stddraw.mousePressed():
                 if stddraw.mouseX() <= 10.5 + 0.6 and stddraw.mouseX() >= 10.5 - 0.6:
@@ -74,221 +91,93 @@ class Game:
                         self.is_paused = True
                         print("Stopped")
                         self.display_game_menu(grid_h, grid_w, grid)
+                        last_time = time.perf_counter()
 
-            # check for any user interaction via the keyboard
-            if stddraw.hasNextKeyTyped():
+            # check for any user interaction via the keyboard, all the keys
+            # typed since the last frame are given to the engine as actions
+            while stddraw.hasNextKeyTyped():
                 key_typed = stddraw.nextKeyTyped()
-                # if the left arrow key has been pressed
-                if key_typed == "left":
-                    # move the tetromino left by one
-                    current_tetromino.move(key_typed, grid)
-                # if the right arrow key has been pressed
-                elif key_typed == "right":
-                    # move the tetromino right by one
-                    current_tetromino.move(key_typed, grid)
-                # if the down arrow key has been pressed
-                elif key_typed == "down":
-                    # move the tetromino down by one
-                    # (causes the tetromino to fall down faster)
-                    current_tetromino.move(key_typed, grid)
-                elif key_typed == "up":
-                    # rotate the tetromino
-                    current_tetromino.rotation(grid, current_tetromino)
                 # Additinoal pause options pressing p
-                elif key_typed == "p":
+                if key_typed == "p":
                     print("Paused")
                     # pause game
                     self.is_paused = not self.is_paused
                     self.display_game_menu(grid_h, grid_w, grid)
-
-                # clear the queue of the pressed keys for a smoother interaction
-                stddraw.clearKeysTyped()
-
+                    last_time = time.perf_counter()
+                    # clear the queue of the pressed keys during the pause
+                    stddraw.clearKeysTyped()
+                    actions = []
+                elif key_typed in self.engine.actions:
+                    actions.append(key_typed)
+            # the autoplayer gives the keys for each new tetromino
+            if self.autoplayer is not None and not self.is_paused:
+                actions.extend(self.autoplayer.next_actions(self.engine))
+
+            # the real time passed since the last frame
+            current_time = time.perf_counter()
+            accumulator = min(accumulator + (current_time - last_time) * 1000,
+                              max_accumulator)
+            last_time = current_time
             # Check if is paused?
             if not self.is_paused:
-                # if not make down the tetromino
-                success = current_tetromino.move("down", grid)
-
-            # lock the active tetromino onto the grid when it cannot go down anymore
-            if not success:
-                # get the tile matrix of the tetromino without empty rows and columns
-                # and the position of the bottom left cell in this matrix
-                tiles_to_place = current_tetromino.tile_matrix
-                # update the game grid by locking the tiles of the landed tetromino
-                self.game_over = grid.update_grid(tiles_to_place)
-
-                # Merge process
-                merge = self.check_merging(grid)
-                while merge:
-                    merge = self.check_merging(grid)
-
-                # To check if rows are full
-                row_count = self.is_full(grid_h, grid_w, grid)
-                index = 0
-                # Shift down the rows.
-                while index < grid_h:
-                    while row_count[index]:
-                        self.slide_down(row_count, grid)
-                        row_count = self.is_full(grid_h, grid_w, grid)
-                    index += 1
-
-                # Assigns labels to each tile using 4-component labeling
-                labels, num_labels = self.connected_component_labeling(grid.tile_matrix, grid_w, grid_h)
-                free_tiles = [[False for v in range(grid_w)] for b in range(grid_h)]
-                free_tiles, num_free = self.find_free_tiles(grid_h, grid_w, labels, free_tiles)
-                # Drop down the tiles that is free
-                grid.move_free_tiles(free_tiles)
-
-                # until no tile to drop down
-                while num_free != 0:
-                    labels, num_labels = self.connected_component_labeling(grid.tile_matrix, grid_w, grid_h)
-                    free_tiles = [[False for v in range(grid_w)] for b in range(grid_h)]
-                    free_tiles, num_free = self.find_free_tiles(grid_h, grid_w, labels, free_tiles)
-                    grid.move_free_tiles(free_tiles)
-
-                #klabels, num_labels = self.connected_component_labeling(grid.tile_matrix, grid_w, grid_h)
-                merge = self.check_merging(grid)
-                while merge:
-                    merge = self.check_merging(grid)
-
-                row_count = self.is_full(grid_h, grid_w, grid)
-                index = 0
-
-                while index < grid_h:
-                    while row_count[index]:
-                        self.slide_down(row_count, grid)
-                        row_count = self.is_full(grid_h, grid_w, grid)
-                    index += 1
-
-                # Assigns labels to each tile using 4-component labeling
-                labels, num_labels = self.connected_component_labeling(grid.tile_matrix, grid_w, grid_h)
-                free_tiles = [[False for v in range(grid_w)] for b in range(grid_h)]
-                free_tiles, num_free = self.find_free_tiles(grid_h, grid_w, labels, free_tiles)
-                # Drop down the tiles that is free
-                grid.move_free_tiles(free_tiles)
-
-                # until no tile to drop down
-                while num_free != 0:
-                    labels, num_labels = self.connected_component_labeling(grid.tile_matrix, grid_w, grid_h)
-                    free_tiles = [[False for v in range(grid_w)] for b in range(grid_h)]
-                    free_tiles, num_free = self.find_free_tiles(grid_h, grid_w, labels, free_tiles)
-                    grid.move_free_tiles(free_tiles)
-
-                #labels, num_labels = self.connected_component_labeling(grid.tile_matrix, grid_w, grid_h)
-
-                # end the main game loop if the game is over
-                if self.game_over:
-                    print("Game Over")
-                    self.is_finished = True
-                    self.display_game_menu(grid_h, grid_w, grid)
-
-                self.round_count += 1
-
-                # create the next tetromino to enter the game grid
-                # by using the create_tetromino function defined below
-                current_tetromino = self.tetrominos[self.round_count]
-                grid.current_tetromino = current_tetromino
-                # Random position the tetromino
-                new_x, new_y = random.randint(2, 9), 21
-                current_tetromino.move_pos(new_x, new_y)
-
-                # Empty the list and put new tetrominos
-                if self.round_count == 8:
-                    self.tetrominos = list()
-                    self.round_count = 0
-                    self.create_tetromino(grid_h, game_w)
-                # Show next tetromino
-                self.next_type = self.tetrominos[self.round_count+1]
-                self.next_type.move_pos(15, 15)
+                # if not advance the engine for the time passed
+                while accumulator >= self.engine.tick_ms:
+                    accumulator -= self.engine.tick_ms
+                    for action in actions:
+                        self.record(action)
+                    events = self.engine.tick(actions)
+                    # the actions are applied once, in the first tick
+                    actions = []
+                    for event in events:
+                        # end the main game loop if the game is over
+                        if event[0] == "game_over":
+                            print("Game Over")
+                            if self.autoplayer is not None:
+                                # the autoplayer starts a new game at once
+                                self.restart = True
+                                continue
+                            self.game_over = True
+                            self.is_finished = True
+                            self.display_game_menu(grid_h, grid_w, grid)
+                        # Show next tetrominoes
+                        elif event[0] == "spawn":
+                            self.show_preview()
+                        elif event[0] == "speed":
+                            print("New Speed:", event[1])
+                    if self.is_finished or self.restart:
+                        # the time spent in the menu is not simulated
+                        accumulator = 0
+                        last_time = time.perf_counter()
+                        break
 
             # In case restarting game, clear places with nonetype.
             if self.restart:
-                for a in range(0, 20):
-                    for b in range(12):
-                        grid.tile_matrix[a][b] = None
                 self.restart = False
-                grid.game_over = False
-                current_tetromino = self.tetrominos[self.round_count]
-                grid.current_tetromino = current_tetromino
-                new_x, new_y = random.randint(2, 9), 22
-                current_tetromino.move_pos(new_x, new_y)
+                self.record("restart")
+                self.engine.restart()
 
             # display the game grid with the current tetromino
             grid.display()
-
-    # Checks if there is tile to merge.
-    def check_merging(self, grid):
-        merged = False
-        for a in range(0, 19):
-            for b in range(12):
-                # If there is a tile above
-                if grid.tile_matrix[a][b] != None and grid.tile_matrix[a + 1][b] != None:
-                    # If two tiles numbers are equal
-                    if grid.tile_matrix[a][b].number == grid.tile_matrix[a + 1][b].number:
-                        # Delete the above tile
-                        grid.tile_matrix[a + 1][b].set_position(None)
-                        grid.tile_matrix[a + 1][b] = None
-                        # Update the number of below tile
-                        grid.tile_matrix[a][b].number += grid.tile_matrix[a][b].number
-                        # Update the score
-                        grid.score += grid.tile_matrix[a][b].number
-                        # To change the game speed.
-                        grid.last_updated += grid.tile_matrix[a][b].number
-                        # Change color
-                        grid.tile_matrix[a][b].updateColor(grid.tile_matrix[a][b].number)
-                        merged = True
-        return merged
-
-    # If row is full return True, else False
-    def is_full(self, grid_h, grid_w, grid):
-        # At the beginning, all is false.
-        row_count = [False for i in range(grid_h)]
-        # score if row is full
-        score = 0
-        for h in range(grid_h):
-            # counter = 12 that means row is full in our grid.
-            counter = 0
-            for w in range(grid_w):
-                if grid.is_occupied(h, w):
-                    counter += 1
-                # If row is full, calculate score.
-                if counter == 12:
-                    score = 0
-                    for a in range(12):
-                        score += grid.tile_matrix[h][a].number
-                    row_count[h] = True
-        # Update the score
-        grid.score += score
-        # Update game speed if needed.
-        grid.last_updated += score
-        return row_count
-
-    def slide_down(self, row_count, grid):
-        for index, i in enumerate(row_count):
-            if i:
-                for a in range(index, 19):
-                    row = np.copy(grid.tile_matrix[a + 1])
-                    grid.tile_matrix[a] = row
-                    for b in range(12):
-                        if grid.tile_matrix[a][b] is not None:
-                            grid.tile_matrix[a][b].move(0, -1)
-                break
-
-    # A function for creating random shaped tetrominoes to enter the game grid
-    def create_tetromino(self, grid_height, grid_width):
-        self.rotated = False
-        # type (shape) of the tetromino is determined randomly
-        tetromino_types = ['I', 'O', 'Z', 'J', 'L', 'T', 'S']
-        for i in range(10):
-            random_index = random.randint(0, len(tetromino_types) - 1)
-            self.random_type = tetromino_types[random_index]
-            # create and return the tetromino
-            tetromino = Tetromino(self.random_type, grid_height, grid_width)
-            self.tetrominos.append(tetromino)
-        # return self.tetrominos  # not necessary, the function is updated.
+            # wait for the rest of the frame
+            remaining_ms = frame_ms - (time.perf_counter() - current_time) * 1000
+            if remaining_ms > 0:
+                time.sleep(remaining_ms / 1000)
+
+    # Records the given input (see replay.ReplayRecorder.record) before the
+    # next tick of the engine if the game is recorded
+    def record(self, input, value=None):
+        if self.recorder is not None:
+            self.recorder.record(self.engine.tick_count, input, value)
+
+    # Moves the next tetrominoes to the right side, one below the other
+    def show_preview(self):
+        for i, tetromino in enumerate(self.engine.preview):
+            tetromino.move_pos(15, 15 - 4 * i)
 
     # A function for displaying a simple menu before starting the game
     def display_game_menu(self, grid_height, grid_width, grid):
+        # the menu is drawn over the game grid, so it is drawn fully next time
+        grid.invalidate()
          #the colors used for the menu
         background_color = Color(42, 69, 99)
         button_color = Color(25, 255, 228)
@@ -302,7 +191,7 @@ class Game:
         # the coordinates to display the image centered horizontally
         img_center_x, img_center_y = (grid_width - 1) / 2, grid_height - 7
         # the image is modeled by using the Picture class
-        image_to_display = Picture(img_file)
+        image_to_display = self.menu_image(img_file)
         # add the image to the drawing canvas
         stddraw.picture(image_to_display, img_center_x, img_center_y)
         # the dimensions for the start game button
@@ -331,10 +220,12 @@ class Game:
 
             text1_to_display = "Restart"
             stddraw.text(img_center_x, 2, text1_to_display)
+            # display the menu once, it is not drawn again until it is closed
+            stddraw.show(0)
             # the user interaction loop for the simple menu
             while True:
-                # display the menu and wait for a short time (50 ms)
-                stddraw.show(50)
+                # wait for the user without using the processor
+                stddraw.waitForEvent()
                 # check if the mouse has been left-clicked on the start game button
                 if stddraw.mousePressed():
                     # get the coordinates of the most recent location at which the mouse
@@ -350,7 +241,7 @@ class Game:
                             self.is_paused = False
                             grid.score = 0
                             self.restart = True
-                            grid.speed_increased_counter = 0
+                            grid.reset_speed()
                             # Choice to game speed
                             self.speed_screen(grid, background_color, grid_width, grid_height, img_file, button_color)
                             break
@@ -362,15 +253,18 @@ class Game:
             stddraw.setPenColor(text_color)
             text1_to_display = "Restart"
             stddraw.text(img_center_x, 5, text1_to_display)
+            # display the menu once, it is not drawn again until it is closed
+            stddraw.show(0)
             while True:
-                stddraw.show(50)
+                # wait for the user without using the processor
+                stddraw.waitForEvent()
                 if stddraw.mousePressed():
 
                     mouse_x, mouse_y = stddraw.mouseX(), stddraw.mouseY()
                     if mouse_x >= button_blc_x and mouse_x <= button_blc_x + button_w:
                         if mouse_y >= button_blc_y and mouse_y <= button_blc_y + button_h:
                             self.restart = True
-                            grid.speed_increased_counter = 0
+                            grid.reset_speed()
                             self.is_paused = False
                             self.is_finished = False
                             self.game_over = False
@@ -383,8 +277,11 @@ class Game:
         else:
             text1_to_display = "Start Game"
             stddraw.text(img_center_x, 5, text1_to_display)
+            # display the menu once, it is not drawn again until it is closed
+            stddraw.show(0)
             while True:
-                stddraw.show(50)
+                # wait for the user without using the processor
+                stddraw.waitForEvent()
                 if stddraw.mousePressed():
                     mouse_x, mouse_y = stddraw.mouseX(), stddraw.mouseY()
                     if mouse_x >= button_blc_x and mouse_x <= button_blc_x + button_w:
@@ -396,12 +293,19 @@ class Game:
             self.speed_screen(grid, background_color, grid_width, grid_height, img_file, button_color)
 
 
+    # Returns the image displayed on the menus, the image file is loaded only
+    # the first time and the same picture is used for all the menus
+    def menu_image(self, img_file):
+        if self.menu_picture is None:
+            self.menu_picture = Picture(img_file)
+        return self.menu_picture
+
     # Game speed section, slow normal fast
     def speed_screen(self, grid, background_color, grid_width, grid_height, img_file, button_color):
         stddraw.clear(background_color)
         # image coord.
         img_center_x, img_center_y = (grid_width - 1) / 2, grid_height - 7
-        image_to_display = Picture(img_file)
+        image_to_display = self.menu_image(img_file)
         # picture the image
         stddraw.picture(image_to_display, img_center_x, img_center_y)
         # start game button dimensions
@@ -425,8 +329,11 @@ class Game:
         text_to_display = "Fast"
         stddraw.text(img_center_x + 5, 5, text_to_display)
 
+        # display the menu once, it is not drawn again until it is closed
+        stddraw.show(0)
         while True:
-            stddraw.show(50)
+            # wait for the user without using the processor
+            stddraw.waitForEvent()
             if stddraw.mousePressed():
                 mouse_x, mouse_y = stddraw.mouseX(), stddraw.mouseY()
                 print(mouse_x)
@@ -436,108 +343,26 @@ class Game:
                 if mouse_x >= button1_blc_x and mouse_x <= button1_blc_x + button_w:
                     if mouse_y >= button1_blc_y and mouse_y <= button1_blc_y + button_h:
                         print("Normal speed")
-                        grid.game_speed = 175
+                        grid.set_speed(175)
                         break
                 if mouse_x >= button2_blc_x and mouse_x <= button2_blc_x + button_w:
                     if mouse_y >= button2_blc_y and mouse_y <= button2_blc_y + button_h:
                         print("Slow speed")
-                        grid.game_speed = 250
+                        grid.set_speed(250)
                         break
                 if mouse_x >= button3_blc_x and mouse_x <= button3_blc_x + button_w:
                     if mouse_y >= button3_blc_y and mouse_y <= button3_blc_y + button_h:
                         print("Fast speed")
-                        grid.game_speed = 120
+                        grid.set_speed(120)
                         break
-
-    def connected_component_labeling(self, grid, grid_w, grid_h):
-        # Initially, all pixels are assigned the label 0
-        labels = np.zeros([grid_h, grid_w], dtype=int)
-        min_equivalent_labels = []  # List to store minimum equivalent labels
-        current_label = 1  # Current label counter
-        for y in range(grid_h):
-            for x in range(grid_w):
-                if grid[y, x] is None:
-                    continue
-                # Retrieve neighbor labels of the current pixel
-                neighbor_labels = self.get_neighbor_labels(labels, (x, y))
-                # If the pixel has no non-empty neighbors
-                if len(neighbor_labels) == 0:
-                    # Assign the current label to the pixel and increment the current label counter
-                    labels[y, x] = current_label
-                    current_label += 1
-                    # Initially, the minimum equivalent label is the pixel's own label
-                    min_equivalent_labels.append(labels[y, x])
-                # If there is at least one non-empty neighbor
-                else:
-                    # Assign the minimum neighbor label to the pixel
-                    labels[y, x] = min(neighbor_labels)
-                    # Check for conflicts if there are multiple different neighbor labels
-                    if len(neighbor_labels) > 1:
-                        labels_to_merge = set()
-                        # Populate a set with the minimum equivalent label for each neighbor
-                        for l in neighbor_labels:
-                            labels_to_merge.add(min_equivalent_labels[l - 1])
-                        # Update minimum equivalent labels related to the conflict
-                        self.update_min_equivalent_labels(min_equivalent_labels, labels_to_merge)
-        # Second pass to rearrange equivalent labels consecutively
-        self.rearrange_min_equivalent_labels(min_equivalent_labels)
-        # Assign final labels to pixels based on minimum equivalent labels
-        for y in range(grid_h):
-            for x in range(grid_w):
-                if grid[y, x] is None:
-                    continue
-                labels[y, x] = min_equivalent_labels[labels[y, x] - 1]
-        return labels, len(set(min_equivalent_labels))
-
-    def get_neighbor_labels(self, label_values, pixel_indices):
-        x, y = pixel_indices
-        # Set to store unique neighbor labels
-        neighbor_labels = set()
-        # Include upper pixel if it exists and is non-empty
-        if y != 0:
-            u = label_values[y - 1, x]
-            if u != 0:
-                neighbor_labels.add(u)
-        # Include left pixel if it exists and is non-empty
-        if x != 0:
-            l = label_values[y, x - 1]
-            if l != 0:
-                neighbor_labels.add(l)
-        return neighbor_labels
-
-    def update_min_equivalent_labels(self, all_min_eq_labels, min_eq_labels_to_merge):
-        # Determine the smallest value among conflicting neighbor labels
-        min_value = min(min_eq_labels_to_merge)
-        # Update minimum equivalent labels
-        for index in range(len(all_min_eq_labels)):
-            if all_min_eq_labels[index] in min_eq_labels_to_merge:
-                all_min_eq_labels[index] = min_value
-
-    def rearrange_min_equivalent_labels(self, min_equivalent_labels):
-        # Sort and assign consecutive values to minimum equivalent labels
-        different_labels = set(min_equivalent_labels)
-        different_labels_sorted = sorted(different_labels)
-        new_labels = np.zeros(max(min_equivalent_labels) + 1, dtype=int)
-        count = 1
-        for l in different_labels_sorted:
-            new_labels[l] = count
-            count += 1
-        for ind in range(len(min_equivalent_labels)):
-            old_label = min_equivalent_labels[ind]
-            new_label = new_labels[old_label]
-            min_equivalent_labels[ind] = new_label
-    def find_free_tiles(self, grid_h, grid_w, labels, free_tiles):
-        counter = 0
-        free_labels = []
-        for x in range(grid_h):
-            for y in range(grid_w):
-                if labels[x, y] != 1 and labels[x, y] != 0:
-                    if x == 0:
-                        free_labels.append(labels[x, y])
-                    if not free_labels.count(labels[x, y]):
-                        free_tiles[x][y] = True
-                        counter += 1
-        return free_tiles, counter
-
+        # the chosen speed is a part of the recorded game
+        self.record("speed", grid.game_speed)
+
+# the game is recorded into the file given after --record
+record_file = None
+if "--record" in sys.argv:
+    record_file = sys.argv[sys.argv.index("--record") + 1]
+# the game plays itself when --autoplay is given
+autoplay = "--autoplay" in sys.argv
 game = Game()
-game.start()
\ No newline at end of file
+game.start(record_file, autoplay)
\ No newline at end of file
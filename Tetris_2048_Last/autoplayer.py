@@ -0,0 +1,269 @@
+import sys  # used for the command line arguments
+import time  # used for the time budget of each move
+import numpy as np  # fundamental Python module for scientific computing
+from merge_engine import merge_tiles  # used for merging the tiles
+from gravity import find_drops  # used for dropping the free tiles
+from tetromino import orientations, kicks, piece_fits  # the piece tables
+from placement_table import landing_spots  # used for the next tetrominoes
+
+# the default weights of the features of a board (see AutoPlayer.evaluate)
+default_weights = {
+    "score": 0.05,  # the score gained by the placements
+    "height": -0.5,  # the sum of the heights of the columns
+    "max_height": -0.5,  # the height of the highest column
+    "holes": -3.0,  # the empty cells below the top of their columns
+    "bumpiness": -0.3,  # the sum of the height differences of the columns
+    "game_over": -1e9,  # the placements with tiles above the game grid
+}
+
+
+# Returns the bits of each row of the given value plane (see GameGrid.row_bits)
+def plane_row_bits(plane):
+    weights = np.left_shift(1, np.arange(plane.shape[1], dtype=np.int64))
+    return [int(bits) for bits in (plane != 0).astype(np.int64) @ weights]
+
+
+# Returns the heights of the first game_width columns of the given value plane
+# (the row index of the topmost tile + 1, 0 for the empty columns) as a list
+# and the number of holes (the empty cells below the top of their column)
+def plane_skyline(plane, game_width):
+    occupied = plane[:, :game_width] != 0
+    heights = np.where(occupied.any(axis=0),
+                       plane.shape[0] - np.argmax(occupied[::-1], axis=0), 0)
+    return heights.tolist(), int(heights.sum()) - int(np.count_nonzero(occupied))
+
+
+# Resolves the merges, the full rows and the free tiles on the given value
+# plane (see GameGrid.value_plane) in place like GameEngine.resolve does after
+# a lock, where the full rows are the rows whose first game_width cells are all
+# occupied. Returns the score gained.
+def settle(plane, game_width):
+    score = 0
+    while True:
+        gained, merges = merge_tiles(plane)
+        score += gained
+        full_rows = np.nonzero((plane[:, :game_width] != 0).all(axis=1))[0]
+        if len(full_rows) > 0:
+            numbers = np.left_shift(1, plane[full_rows].astype(np.int64))
+            score += int(numbers[plane[full_rows] != 0].sum())
+            kept = np.ones(plane.shape[0], dtype=bool)
+            kept[full_rows] = False
+            n_kept = int(kept.sum())
+            plane[:n_kept] = plane[kept]
+            plane[n_kept:] = 0
+        if len(merges) == 0 and len(full_rows) == 0:
+            return score
+        # drop down the tiles that are not connected to the bottommost row,
+        # only the tiles next to the merged tiles when no row is cleared
+        emptied_cells = None
+        if len(full_rows) == 0:
+            emptied_cells = [(row + 1, col) for row, col, number in merges]
+        drops = find_drops(plane_row_bits(plane), plane.shape[1], emptied_cells)
+        rows, cols = np.nonzero(drops)
+        values = plane[rows, cols]
+        plane[rows, cols] = 0
+        plane[rows - drops[rows, cols], cols] = values
+
+
+# A class for playing the game automatically: for each tetromino it tries all
+# its reachable placements (all the rotations and the columns it can reach by
+# moving from where it is and dropping), resolves each resulting board like
+# the engine and scores it with a weighted sum of its features, looking ahead
+# at the tetrominoes in the preview queue with a beam search (where they are
+# dropped from above at each landing spot, see placement_table). The placement
+# is given as the keys (actions of the engine) to press for it.
+class AutoPlayer:
+    # A constructor for creating a player that keeps the best beam_width boards
+    # at each level of the search and stops looking ahead when time_budget
+    # seconds have passed for a move (the placements of the current tetromino
+    # are always all tried)
+    def __init__(self, beam_width=4, time_budget=0.05, weights=None):
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.weights = dict(default_weights)
+        if weights is not None:
+            self.weights.update(weights)
+        # the tetromino the last keys were given for
+        self.planned_tetromino = None
+
+    # Returns the keys to press for the current tetromino of the given engine
+    # when it is a new tetromino, and an empty list otherwise
+    def next_actions(self, engine):
+        if engine.current_tetromino is self.planned_tetromino:
+            return []
+        self.planned_tetromino = engine.current_tetromino
+        return self.choose_actions(engine)
+
+    # Searches the placements of the current and the next tetrominoes of the
+    # given engine and returns the keys for the best placement of the current
+    # tetromino
+    def choose_actions(self, engine):
+        deadline = time.perf_counter() + self.time_budget
+        grid = engine.grid
+        game_width = engine.game_width
+        current = engine.current_tetromino
+        # the tetrominoes as (type, orientation, x, y, values of the tiles)
+        pieces = [piece_state(current)]
+        pieces.extend(piece_state(tetromino) for tetromino in engine.preview)
+        # the beam holds (evaluation, score, plane, column heights, holes,
+        # keys of the first move), the search starts from the column heights
+        # and the holes kept by the game grid
+        heights = grid.column_heights()[:game_width]
+        beam = [(0.0, 0, grid.value_plane.copy(), heights, grid.holes, [])]
+        for depth, piece in enumerate(pieces):
+            children = []
+            for evaluation, score, plane, heights, holes, first_keys in beam:
+                if depth == 0:
+                    spots = placements(piece, game_width, grid.row_bits)
+                else:
+                    spots = ((None,) + spot for spot in landing_spots(piece[0], heights))
+                for keys, orientation, x, y in spots:
+                    # looking ahead stops when the time is up
+                    if depth > 0 and time.perf_counter() > deadline:
+                        break
+                    new_plane = plane.copy()
+                    game_over = place(new_plane, piece, orientation, x, y)
+                    gained = settle(new_plane, game_width)
+                    if gained == 0:
+                        # nothing merged or cleared (both score), only the
+                        # columns of the placed tiles changed
+                        new_heights, new_holes = place_skyline(heights, holes, piece,
+                                                               orientation, x, y, plane.shape[0])
+                    else:
+                        new_heights, new_holes = plane_skyline(new_plane, game_width)
+                    children.append((self.evaluate(new_heights, new_holes, score + gained, game_over),
+                                     score + gained, new_plane, new_heights, new_holes,
+                                     keys if depth == 0 else first_keys))
+            if len(children) == 0:
+                break
+            children.sort(key=lambda child: child[0], reverse=True)
+            beam = children[:self.beam_width]
+            if time.perf_counter() > deadline:
+                break
+        return beam[0][5]
+
+    # Returns the weighted sum of the features of a board with the given column
+    # heights and holes (see plane_skyline) and the given score gained
+    def evaluate(self, heights, holes, score, game_over):
+        weights = self.weights
+        bumpiness = sum(abs(left - right) for left, right in zip(heights, heights[1:]))
+        return (weights["score"] * score + weights["height"] * sum(heights) +
+                weights["max_height"] * max(heights) +
+                weights["holes"] * holes +
+                weights["bumpiness"] * bumpiness +
+                weights["game_over"] * game_over)
+
+
+# Returns the state of the given tetromino as (type, orientation, x, y, values)
+# where (x, y) is the bottom left cell of its tile matrix and values are the
+# log2 of the numbers on its tiles in the order of the cells of orientations
+def piece_state(tetromino):
+    cells = orientations[tetromino.type][tetromino.orientation][0]
+    values = [tetromino.tile_matrix[row][col].number.bit_length() - 1
+              for col, row in cells]
+    corner = tetromino.bottom_left_corner
+    return (tetromino.type, tetromino.orientation, corner.x, corner.y, values)
+
+
+# Yields the placements of the given piece (see piece_state) reachable on a grid
+# of the given width with the occupied cells given as row_bits: the piece is
+# rotated where it is (with the wall kicks of Tetromino.rotation), moved to each
+# column it can reach and hard dropped. Each placement is given as (keys,
+# orientation, x, y) with the keys (actions of the engine) that lead to it.
+def placements(piece, grid_width, row_bits):
+    type, orientation, x, y, values = piece
+    rotations = []
+    for turns in range(4):
+        if turns > 0:
+            # rotate clockwise with the first wall kick that fits
+            orientation = (orientation + 1) % 4
+            for dx, dy in kicks[type]:
+                if piece_fits(type, orientation, x + dx, y + dy, grid_width, row_bits):
+                    x, y = x + dx, y + dy
+                    break
+            else:
+                break
+        # the same cells are not tried twice (e.g. all the orientations of O)
+        cells = frozenset((x + dx, y + dy) for dx, dy in orientations[type][orientation][1])
+        if cells in rotations:
+            continue
+        rotations.append(cells)
+        for direction, step in (("left", -1), ("right", 1)):
+            moved_x = x
+            moves = 0
+            while True:
+                if direction == "right" or moves > 0:
+                    # drop the piece from the reached column
+                    drop_y = y
+                    while piece_fits(type, orientation, moved_x, drop_y - 1, grid_width, row_bits):
+                        drop_y -= 1
+                    keys = ["up"] * turns + [direction] * moves + ["space"]
+                    yield keys, orientation, moved_x, drop_y
+                if not piece_fits(type, orientation, moved_x + step, y, grid_width, row_bits):
+                    break
+                moved_x += step
+                moves += 1
+
+
+# Places the given piece (see piece_state) in the given orientation with the
+# bottom left cell of its tile matrix at (x, y) on the given value plane and
+# returns whether any of its tiles is above the plane (the game is over)
+def place(plane, piece, orientation, x, y):
+    game_over = False
+    for (dx, dy), value in zip(orientations[piece[0]][orientation][1], piece[4]):
+        if y + dy < plane.shape[0]:
+            plane[y + dy, x + dx] = value
+        else:
+            game_over = True
+    return game_over
+
+
+# Returns the column heights and the holes (see plane_skyline) of a board with
+# the given column heights and holes after placing the given piece like place
+# does on a value plane with the given number of rows
+def place_skyline(heights, holes, piece, orientation, x, y, n_rows):
+    heights = list(heights)
+    for dx, dy in orientations[piece[0]][orientation][1]:
+        if y + dy < n_rows:
+            col = x + dx
+            # the tile fills a cell, the cells between it and the old top of
+            # its column become holes when it is above the top
+            holes -= 1
+            if y + dy + 1 > heights[col]:
+                holes += y + dy + 1 - heights[col]
+                heights[col] = y + dy + 1
+    return heights, holes
+
+
+# Plays games with the engine and the autoplayer without drawing anything and
+# reports the placed tetrominoes, the scores and the time spent on the moves
+def main():
+    from game_engine import GameEngine  # the class for running the game rules
+    n_pieces = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    engine = GameEngine(preview_depth=3, seed=seed)
+    player = AutoPlayer()
+    placed, games, move_times = 0, 1, []
+    while placed < n_pieces:
+        if engine.current_tetromino is not player.planned_tetromino:
+            start = time.perf_counter()
+            actions = player.next_actions(engine)
+            move_times.append(time.perf_counter() - start)
+        else:
+            actions = []
+        events = engine.tick(actions)
+        for event in events:
+            if event[0] == "lock":
+                placed += 1
+            elif event[0] == "game_over":
+                print("Game over: %d points" % engine.grid.score)
+                games += 1
+                engine.restart()
+    print("Seed:", engine.seed)
+    print("Tetrominoes: %d in %d game(s), score: %d" % (placed, games, engine.grid.score))
+    print("Time per move: %.1f ms on average, %.1f ms at most" %
+          (1000 * sum(move_times) / len(move_times), 1000 * max(move_times)))
+
+
+if __name__ == "__main__":
+    main()
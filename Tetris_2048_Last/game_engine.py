@@ -0,0 +1,251 @@
+from collections import deque  # used for the queue of the next tetrominoes
+from merge_engine import merge_tiles  # used for merging the tiles
+from gravity import find_drops  # used for dropping the free tiles
+from game_grid import GameGrid  # the class for modeling the game grid
+from piece_source import PieceSource  # used for creating the tetrominoes
+from random_streams import RandomStreams  # used for all the random values
+
+
+# A class for running the rules of the game without drawing anything or waiting
+# between the moves, so that games can be simulated as fast as possible (the
+# windowed game in Tetris_2048.py is a frontend that displays this engine)
+class GameEngine:
+    # the actions that can be given to the step method (None means no input,
+    # "space" drops the current tetromino down at once and locks it)
+    actions = (None, "left", "right", "down", "up", "space")
+    # the simulated time (in ms) that passes in each call of the tick method
+    tick_ms = 10
+
+    # A constructor for creating the engine with an empty game grid, the types
+    # of the tetrominoes are chosen by the given randomizer ("bag" or
+    # "uniform", see piece_source) and preview_depth (at least 1) of the next
+    # tetrominoes are known in advance. All the random values of the game come
+    # from the streams created from the given seed (a random seed if it is
+    # None, the seed used is kept in seed) so a game can be played again.
+    def __init__(self, grid_h=20, grid_w=20, game_w=12, randomizer="bag",
+                 preview_depth=1, seed=None):
+        # set the dimensions of the game grid, game_w is the width of the part
+        # of the grid where the tetrominoes move (excluding the next panel)
+        self.grid_height = grid_h
+        self.grid_width = grid_w
+        self.game_width = game_w
+        self.randomizer = randomizer
+        self.preview_depth = preview_depth
+        # create the game grid
+        self.grid = GameGrid(grid_h, grid_w, game_w)
+        # the random streams of the game
+        self.random = RandomStreams(seed)
+        self.seed = self.random.seed
+        # the source of the tetrominoes and the queue of the next tetrominoes
+        self.pieces = PieceSource(randomizer, grid_h, game_w, self.random)
+        # the first tetromino enters the game grid at its initial position
+        self.current_tetromino = next(self.pieces)
+        self.preview = deque(next(self.pieces) for i in range(preview_depth))
+        self.next_tetromino = self.preview[0]
+        self.grid.current_tetromino = self.current_tetromino
+        self.grid.set_next(list(self.preview))
+        # the game_over flag shows whether the game is over or not
+        self.game_over = False
+        # the simulated time (in ms) since the last gravity move, the time the
+        # current tetromino has been resting on the tiles below it and how
+        # long it can rest there before it is locked (0 means it is locked by
+        # the gravity move that finds it cannot go down)
+        self.gravity_timer = 0
+        self.lock_timer = 0
+        self.lock_delay = 0
+        self.landed = False
+        # the number of ticks (see tick) run so far
+        self.tick_count = 0
+
+    # Advances the game by one move: applies the given action (see actions) to
+    # the current tetromino and then moves it down by one. The engine itself
+    # holds the new state, the returned list holds the events of this move as
+    # tuples like ("merge", row, col, number) or ("clear", row), see resolve.
+    def step(self, action=None):
+        events = []
+        self.handle_action(action)
+        # lock the active tetromino onto the grid when it cannot go down anymore
+        if not self.current_tetromino.move("down", self.grid):
+            self.lock_tetromino(events)
+        return events
+
+    # Advances the game by tick_ms of simulated time: applies the given
+    # actions in order, then moves the current tetromino down once every
+    # game_speed ms (of the game grid) and locks it when it has been resting
+    # for lock_delay ms. Returns the events of this tick like step.
+    def tick(self, actions=()):
+        events = []
+        self.tick_count += 1
+        for action in actions:
+            self.handle_action(action)
+            # a hard drop locks the tetromino at once, the next actions are
+            # applied to the next tetromino
+            if action == "space":
+                self.lock_tetromino(events)
+        self.gravity_timer += self.tick_ms
+        if self.gravity_timer >= self.grid.game_speed:
+            self.gravity_timer -= self.grid.game_speed
+            if not self.current_tetromino.move("down", self.grid):
+                self.landed = True
+        if self.landed:
+            # the tetromino may have been moved off the tiles below it
+            if self.current_tetromino.can_be_moved("down", self.grid):
+                self.landed = False
+                self.lock_timer = 0
+            elif self.lock_timer >= self.lock_delay:
+                self.lock_tetromino(events)
+            else:
+                self.lock_timer += self.tick_ms
+        return events
+
+    # Applies the given action (see actions) to the current tetromino
+    def handle_action(self, action):
+        if action == "up":
+            # rotate the tetromino
+            self.current_tetromino.rotation(self.grid)
+        elif action in ("left", "right", "down"):
+            # move the tetromino by one in the given direction
+            self.current_tetromino.move(action, self.grid)
+        elif action == "space":
+            # drop the tetromino down as far as it can go
+            self.current_tetromino.hard_drop(self.grid)
+
+    # Locks the current tetromino onto the grid, resolves the merges, the full
+    # rows and the free tiles and lets the next tetromino enter the game grid.
+    # The events added are ("lock", type), the events of resolve, ("speed",
+    # new game speed) when the game gets faster, ("game_over",) and ("spawn",
+    # type of the next tetromino).
+    def lock_tetromino(self, events):
+        grid_h = self.grid_height
+        # get the tile matrix of the tetromino
+        tiles_to_place = self.current_tetromino.tile_matrix
+        # update the game grid by locking the tiles of the landed tetromino
+        self.game_over = self.grid.update_grid(tiles_to_place)
+        events.append(("lock", self.current_tetromino.type))
+
+        # the rows and the columns of the locked tiles are the changed ones
+        changed_rows, changed_cols = set(), set()
+        for row in tiles_to_place:
+            for tile in row:
+                if tile is not None and tile.y < grid_h:
+                    changed_rows.add(tile.y)
+                    changed_cols.add(tile.x)
+        # a tetromino locked partly above the game grid (the game is over) may
+        # rest on a tile only through its cells above the grid, so its cells
+        # inside the grid may be free
+        self.resolve(changed_rows, changed_cols, events, self.game_over)
+        # increase the game speed if the score is high enough
+        if self.grid.change_speed():
+            events.append(("speed", self.grid.game_speed))
+
+        if self.game_over:
+            events.append(("game_over",))
+
+        # the next tetromino enters the game grid at a random position and a
+        # new tetromino enters the preview queue
+        self.current_tetromino = self.preview.popleft()
+        self.preview.append(next(self.pieces))
+        self.grid.current_tetromino = self.current_tetromino
+        new_x, new_y = self.random.columns.randint(2, 9), 21
+        self.current_tetromino.move_pos(new_x, new_y)
+        self.landed = False
+        self.lock_timer = 0
+        self.next_tetromino = self.preview[0]
+        self.grid.set_next(list(self.preview))
+        events.append(("spawn", self.current_tetromino.type))
+
+    # Clears the game grid, restores the speed the game starts with and lets
+    # the current tetromino enter the grid again
+    def restart(self):
+        # clear places with nonetype.
+        self.grid.clear()
+        self.grid.score = 0
+        self.grid.reset_speed()
+        self.grid.game_over = False
+        self.game_over = False
+        new_x, new_y = self.random.columns.randint(2, 9), 22
+        self.current_tetromino.move_pos(new_x, new_y)
+        self.gravity_timer = 0
+        self.landed = False
+        self.lock_timer = 0
+
+    # Resolves the merges, the full rows and the free tiles caused by changing
+    # the cells on the given rows and columns until the game grid is stable.
+    # Each round only checks the columns (for merges) and the rows (for being
+    # full) that changed in the previous round: merges remove tiles and do
+    # not fill rows, clearing rows changes every column but fills no other
+    # row and dropping tiles changes the columns and the rows they land on.
+    # The events are added to the given list as the tuples
+    # ("merge", row, col, number), ("clear", row), ("drop", number of tiles)
+    # and ("score", score delta) after each merge or clear stage that scores.
+    # The grid is assumed to have no free tiles unless has_free_tiles is True,
+    # then all the free tiles are dropped in the first round.
+    def resolve(self, changed_rows, changed_cols, events, has_free_tiles=False):
+        grid = self.grid
+        while len(changed_rows) > 0 or len(changed_cols) > 0:
+            # tiles removed by merging or clearing may leave free tiles, only
+            # the tiles next to the cells emptied by merging are checked
+            # (emptied_cells is None when rows are cleared as every row
+            # above them moves or when there may be free tiles anywhere)
+            removed = has_free_tiles
+            emptied_cells = None if has_free_tiles else []
+            has_free_tiles = False
+            # Merge process
+            if len(changed_cols) > 0:
+                merged_cells = self.check_merging(sorted(changed_cols), events)
+                if len(merged_cells) > 0:
+                    removed = True
+                    if emptied_cells is not None:
+                        emptied_cells = merged_cells
+            changed_cols = set()
+            # Remove the full rows and shift down the rows above them.
+            if any(grid.is_full_row(row) for row in changed_rows):
+                self.clear_full_rows(events)
+                removed = True
+                emptied_cells = None
+                changed_cols = set(range(grid.game_width))
+            changed_rows = set()
+            # Drop down the tiles that are not connected to the bottommost row
+            # (found by using 4-component labeling) all the way in one move
+            if removed:
+                drops = find_drops(grid.row_bits, self.grid_width, emptied_cells)
+                moved_cells = list(zip(*drops.nonzero()))
+                if len(moved_cells) > 0:
+                    grid.drop_tiles(drops)
+                    events.append(("drop", len(moved_cells)))
+                    for row, col in moved_cells:
+                        changed_rows.add(int(row - drops[row][col]))
+                        changed_cols.add(int(col))
+
+    # Merges the tiles with the same number on top of each other in the given
+    # columns until there is no tile to merge (see merge_engine.merge_tiles)
+    # and returns the cells (row, col) emptied by the merges
+    def check_merging(self, columns, events):
+        grid = self.grid
+        score, merges = merge_tiles(grid.value_plane, columns)
+        for row, col, number in merges:
+            # Delete the above tile
+            grid.remove_tile(row + 1, col)
+            # Update the number (and the color) of below tile
+            grid.set_number(row, col, number)
+            events.append(("merge", row, col, number))
+        if score > 0:
+            self.add_score(score, events)
+        return [(row + 1, col) for row, col, number in merges]
+
+    # Removes the full rows from the game grid at once and returns the score
+    def clear_full_rows(self, events):
+        full_rows, score = self.grid.clear_full_rows()
+        for row in full_rows:
+            events.append(("clear", row))
+        if score > 0:
+            self.add_score(score, events)
+        return score
+
+    # Adds the given score to the game score
+    def add_score(self, score, events):
+        # Update the score
+        self.grid.score += score
+        # Update game speed if needed.
+        self.grid.last_updated += score
+        events.append(("score", score))
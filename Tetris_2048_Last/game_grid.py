@@ -1,20 +1,45 @@
 import lib.stddraw as stddraw  # used for displaying the game grid
 from lib.color import Color  # used for coloring the game grid
 import numpy as np  # fundamental Python module for scientific computing
-import copy
 from point import Point  # used for tile positions
+from tile import Tile  # used for drawing the tiles locked on the game grid
+from zobrist import zobrist_keys, board_hash, xor_keys  # used for hashing
 
 # A class for modeling the game grid
 class GameGrid:
+    # the heights and the holes are checked against a full scan of the grid
+    # after each change when debug is True
+    debug = False
+
     # A constructor for creating the game grid based on the given arguments
-    def __init__(self, grid_h, grid_w):
+    def __init__(self, grid_h, grid_w, game_w=None):
         # set the dimensions of the game grid as the given arguments
         self.grid_height = grid_h
         self.grid_width = grid_w
-        # create a tile matrix to store the tiles locked on the game grid
-        self.tile_matrix = np.full((grid_h, grid_w), None)
+        # the width of the part of the grid where the tetrominoes move
+        self.game_width = grid_w if game_w is None else game_w
+        # the tiles locked on the game grid are stored as the log2 of their
+        # numbers (1 for 2, 2 for 4, ... and 0 for the empty cells), the tile
+        # on a cell is only created when it is drawn (see tile_at)
+        self.value_plane = np.zeros((grid_h, grid_w), dtype=np.uint8)
+        # the occupied cells of each row as the bits of an integer (bit col is
+        # set when the cell in column col is occupied), updated with the plane
+        self.row_bits = [0] * grid_h
+        # the 64-bit Zobrist hash of the value plane (the XOR of the keys of
+        # its cells, see zobrist.py), updated with the plane, so the same
+        # boards have the same hash
+        self.hash = 0
+        # the height of each column (the row index of its topmost tile + 1, 0
+        # for an empty column) and the number of holes (the empty cells below
+        # the topmost tile of their column), updated with the plane
+        self.heights = [0] * grid_w
+        self.holes = 0
+        # the bits of a row that is full
+        self.full_row_bits = (1 << self.game_width) - 1
         # create the tetromino that is currently being moved on the game grid
         self.current_tetromino = None
+        # the next tetrominoes (the preview queue) shown on the right side
+        self.next_tetrominoes = []
         # the game_over flag shows whether the game is over or not
         self.game_over = False
         # set the color used for the empty grid cells
@@ -27,54 +52,123 @@ class GameGrid:
         self.box_thickness = 8 * self.line_thickness
         # Game score
         self.score = 0
+        # the region (x, y, w, h) of the canvas where the score is displayed
+        self.info_region = (11.5, 17.5, grid_w - 12, 2)
+        # the whole canvas is drawn in the next frame when redraw_all is True,
+        # otherwise only the changed cells (as (x, y)) in dirty_cells, the
+        # cells covered by the tetrominoes in the last and the next frames and
+        # info_region if the score changed
+        self.redraw_all = True
+        self.dirty_cells = set()
+        self.drawn_tetromino_cells = set()
+        self.drawn_info = None
 
         self.pos = Point()
-        # Default game speed
+        # Default game speed, the speed a new game starts with is kept in
+        # start_speed (see set_speed and reset_speed)
+        self.start_speed = 250
         self.game_speed = 250
         # To update speed according to the score
         self.last_updated = 0
         # How many times speed increased?
         self.incr_counter = 0
 
-    # A method for displaying the game grid
+    # A method for displaying the game grid, after the first frame only the
+    # cells that changed since the last frame are drawn again and copied to
+    # the window
     def display(self):
-        # check score > 500, then increased the speed.
-        self.change_speed()
-        # clear the background to empty_cell_color
-        stddraw.clear(self.empty_cell_color)
-        # draw the game grid
-        self.draw_grid()
-        # draw the current/active tetromino if it is not None
-        # (the case when the game grid is updated)
-        # Additional we have to check next_tetromino and draw it.
-        if self.current_tetromino is not None and self.next_tetromino is not None:
+        # the cells covered by the tetrominoes, they are drawn in every frame
+        tetromino_cells = self.tetromino_cells()
+        info = (self.score, self.incr_counter)
+        if self.redraw_all:
+            # draw the parts that do not change during the game (the
+            # background, the grid lines, the stop button and the labels)
+            # from a cached layer
+            stddraw.layer(("grid background",) + self.theme(), self.draw_background)
+            # draw the game grid
+            self.draw_grid()
+            self.draw_info()
+            # draw the current/active tetromino and the next tetromino
+            self.draw_tetrominoes()
+            # draw a box around the game grid from a cached layer (on top of
+            # the tiles as the box covers the outer half of the border cells)
+            stddraw.layer(("grid boundaries",) + self.theme(), self.draw_boundaries)
+            # show the resulting drawing (the game loop waits for the next frame)
+            stddraw.show(0)
+        else:
+            # the changed cells, the cells the tetrominoes left and the cells
+            # they moved to
+            cells = self.dirty_cells | self.drawn_tetromino_cells | tetromino_cells
+            regions = [(x - 0.5, y - 0.5, 1, 1) for x, y in cells]
+            if info != self.drawn_info:
+                regions.append(self.info_region)
+            # restore the background of the changed regions and draw them
+            for region in regions:
+                stddraw.layer(("grid background",) + self.theme(), self.draw_background, region)
+            for x, y in cells:
+                if self.value_plane[y][x] != 0:
+                    self.tile_at(y, x).draw()
+            if info != self.drawn_info:
+                self.draw_info()
+            self.draw_tetrominoes()
+            for region in regions:
+                stddraw.layer(("grid boundaries",) + self.theme(), self.draw_boundaries, region)
+            # show only the changed regions
+            stddraw.show(0, regions)
+        # everything is drawn now
+        self.redraw_all = False
+        self.dirty_cells = set()
+        self.drawn_tetromino_cells = tetromino_cells
+        self.drawn_info = info
+
+    # Makes the next display draw the whole canvas (e.g. after a menu is drawn)
+    def invalidate(self):
+        self.redraw_all = True
+
+    # Returns the cells (as (x, y)) inside the canvas covered by the current
+    # and the next tetrominoes
+    def tetromino_cells(self):
+        cells = set()
+        for tetromino in [self.current_tetromino] + self.next_tetrominoes:
+            if tetromino is None:
+                continue
+            for row in tetromino.tile_matrix:
+                for tile in row:
+                    if tile is not None:
+                        if 0 <= tile.y < self.grid_height:
+                            cells.add((tile.x, tile.y))
+        return cells
+
+    # Draws the current/active tetromino if it is not None (the case when
+    # the game grid is updated) and the next tetrominoes
+    def draw_tetrominoes(self):
+        if self.current_tetromino is not None:
             self.current_tetromino.draw()
-            self.next_tetromino.draw()
+            for tetromino in self.next_tetrominoes:
+                tetromino.draw()
 
-        # draw a box around the game grid
-        self.draw_boundaries()
-        # show the resulting drawing with a pause duration = game_speed ms
-        stddraw.show(self.game_speed)
+    # Returns the colors used for drawing the game grid, the cached layers are
+    # drawn again when these colors change
+    def theme(self):
+        return (str(self.empty_cell_color), str(self.line_color),
+                str(self.boundary_color))
 
-    # A method for drawing the cells and the lines of the game grid
-    def draw_grid(self):
-        # for each cell of the game grid
-        for row in range(self.grid_height):
-            for col in range(self.grid_width):
-                # if the current grid cell is occupied by a tile
-                if self.tile_matrix[row][col] is not None:
-                    # draw this tile
-                    self.tile_matrix[row][col].draw()
-
-        # Drawing the stop button
+    # A method for drawing the parts of the game grid that do not change
+    def draw_background(self):
+        # clear the background to empty_cell_color
+        stddraw.clear(self.empty_cell_color)
+
+        # Drawing the stop button with the font of the tiles
+        stddraw.setFontFamily("Arial")
+        stddraw.setFontSize(14)
         stddraw.setPenColor(Color(0, 0, 0))
         stddraw.filledRectangle(10.5, 18.5, .6, .6)
         stddraw.setPenRadius(100)
         stddraw.setPenColor(Color(255, 255, 255))
         stddraw.text(10.8, 18.8, "Stop")
 
-        self.drawScore(self.score)
-        self.display_info("Speed Increased", self.incr_counter)
+        stddraw.setFontSize(20)
+        stddraw.text(15.8, 16.5, "Next Tetromino:")
 
         # inner lines of the game grid
         stddraw.setPenColor(self.line_color)
@@ -89,6 +183,35 @@ class GameGrid:
             stddraw.line(start_x, y, end_x, y)
         stddraw.setPenRadius()  # reset the pen radius to its default value
 
+    # A method for drawing the tiles locked on the game grid
+    def draw_grid(self):
+        # for each occupied cell of the game grid
+        for row, col in zip(*np.nonzero(self.value_plane)):
+            # draw the tile on this cell
+            self.tile_at(int(row), int(col)).draw()
+
+    # Returns a tile showing the number on the given cell of the game grid (at
+    # the position of the cell), or None if the cell is empty
+    def tile_at(self, row, col):
+        exponent = int(self.value_plane[row][col])
+        if exponent == 0:
+            return None
+        return Tile(Point(col, row), 1 << exponent)
+
+    # Returns the numbers on the locked tiles as an array (0 for empty cells)
+    def numbers(self):
+        return np.where(self.value_plane != 0,
+                        np.left_shift(1, self.value_plane, dtype=np.int64), 0)
+
+    # A method for drawing the score and the number of speed increases (in
+    # info_region)
+    def draw_info(self):
+        # Drawing the score with the font of the tiles
+        stddraw.setFontFamily("Arial")
+        stddraw.setFontSize(14)
+        self.drawScore(self.score)
+        self.display_info("Speed Increased", self.incr_counter)
+
     # A method for drawing the boundaries around the game grid
     def draw_boundaries(self):
         # draw a bounding box around the game grid as a rectangle
@@ -108,8 +231,154 @@ class GameGrid:
         # have tiles with position.y >= grid_height
         if not self.is_inside(row, col):
             return False # the cell is not occupied as it is outside the grid
-        # the cell is occupied by a tile if it is not None
-        return self.tile_matrix[row][col] != None
+        # the cell is occupied by a tile if its bit is set
+        return (self.row_bits[row] >> col) & 1 == 1
+
+    # Returns whether the row with the given index is full
+    def is_full_row(self, row):
+        return self.row_bits[row] & self.full_row_bits == self.full_row_bits
+
+    # Returns the indexes of the full rows from bottom to top
+    def full_rows(self):
+        return [row for row in range(self.grid_height) if self.is_full_row(row)]
+
+    # Returns the height of each column, that is the index of its topmost
+    # occupied cell + 1 (0 for an empty column)
+    def column_heights(self):
+        return list(self.heights)
+
+    # Computes the height of each column from all the rows (the heights are
+    # otherwise updated by each change)
+    def scan_column_heights(self):
+        heights = [0] * self.grid_width
+        # the columns whose topmost occupied cell is already found
+        seen = 0
+        for row in range(self.grid_height - 1, -1, -1):
+            new_bits = self.row_bits[row] & ~seen
+            seen |= new_bits
+            while new_bits:
+                # the lowest set bit gives the column
+                low_bit = new_bits & -new_bits
+                heights[low_bit.bit_length() - 1] = row + 1
+                new_bits ^= low_bit
+        return heights
+
+    # Computes the number of holes from all the rows (the number is otherwise
+    # updated by each change)
+    def scan_holes(self):
+        n_tiles = sum(bin(bits).count("1") for bits in self.row_bits)
+        return sum(self.scan_column_heights()) - n_tiles
+
+    # Returns the height of the given column counting only its tiles below the
+    # given row, found by going down from that row to the first tile
+    def column_top(self, col, row):
+        bit = 1 << col
+        for below in range(min(row, self.grid_height) - 1, -1, -1):
+            if self.row_bits[below] & bit:
+                return below + 1
+        return 0
+
+    # Changes the height of the given column, the cells between the old and
+    # the new height are holes when they are empty (the tile count of the
+    # grid is kept by the callers)
+    def set_height(self, col, height):
+        self.holes += height - self.heights[col]
+        self.heights[col] = height
+
+    # Raises an error if the heights or the number of holes differ from the
+    # ones computed from all the rows (used when debug is True)
+    def check_skyline(self):
+        if self.heights != self.scan_column_heights() or self.holes != self.scan_holes():
+            raise RuntimeError("column heights %s and %d holes do not match the grid "
+                               "(%s and %d holes)" % (self.heights, self.holes,
+                               self.scan_column_heights(), self.scan_holes()))
+
+    # Places the number on the given tile onto the given cell of the game grid
+    def set_tile(self, row, col, tile):
+        self.set_number(row, col, tile.number)
+        if not self.row_bits[row] >> col & 1:
+            # the cell is filled, and the cells below it up to the column top
+            # become holes when it is above the column top
+            self.row_bits[row] |= 1 << col
+            self.holes -= 1
+            if row + 1 > self.heights[col]:
+                self.set_height(col, row + 1)
+        if self.debug:
+            self.check_skyline()
+
+    # Removes the tile on the given cell of the game grid and returns its number
+    def remove_tile(self, row, col):
+        value = int(self.value_plane[row][col])
+        number = 1 << value
+        self.hash ^= self.key(row, col, value)
+        self.value_plane[row][col] = 0
+        self.dirty_cells.add((col, row))
+        self.row_bits[row] &= ~(1 << col)
+        # the cell becomes a hole, or the column gets lower when it was the top
+        self.holes += 1
+        if row + 1 == self.heights[col]:
+            self.set_height(col, self.column_top(col, row))
+        if self.debug:
+            self.check_skyline()
+        return number
+
+    # Changes the number on the tile on the given cell of the game grid
+    def set_number(self, row, col, number):
+        value = number.bit_length() - 1
+        self.hash ^= (self.key(row, col, int(self.value_plane[row][col])) ^
+                      self.key(row, col, value))
+        self.value_plane[row][col] = value
+        self.dirty_cells.add((col, row))
+
+    # Returns the Zobrist key of the given cell having the given value
+    def key(self, row, col, value):
+        return int(zobrist_keys(self.grid_height, self.grid_width)[row, col, value])
+
+    # Computes the hash of the value plane from all its cells (the hash is
+    # otherwise updated by each change)
+    def compute_hash(self):
+        return board_hash(self.value_plane)
+
+    # Removes all the full rows at once by sliding the rows above them down
+    # and returns the indexes of the removed rows and the sum of their numbers
+    def clear_full_rows(self):
+        full_rows = self.full_rows()
+        if len(full_rows) == 0:
+            return full_rows, 0
+        score = int(self.numbers()[full_rows].sum())
+        kept_rows = [row for row in range(self.grid_height) if not self.is_full_row(row)]
+        # gather the kept rows to the bottom, the rows on top become empty
+        n_kept = len(kept_rows)
+        self.value_plane[:n_kept] = self.value_plane[kept_rows]
+        self.value_plane[n_kept:] = 0
+        # the tiles of the full rows are removed (their cells stop being
+        # counted as tiles) and each column is lowered by the number of full
+        # rows below its top, going down to the next tile if its top was in
+        # a full row
+        self.holes += sum(bin(self.row_bits[row]).count("1") for row in full_rows)
+        self.row_bits = [self.row_bits[row] for row in kept_rows] + [0] * len(full_rows)
+        for col in range(self.grid_width):
+            if self.heights[col] > 0:
+                n_below = sum(1 for row in full_rows if row < self.heights[col])
+                self.set_height(col, self.column_top(col, self.heights[col] - n_below))
+        if self.debug:
+            self.check_skyline()
+        # most of the cells may have changed
+        self.hash = self.compute_hash()
+        # all the rows from the lowest full row to the top have changed
+        for row in range(full_rows[0], self.grid_height):
+            for col in range(self.game_width):
+                self.dirty_cells.add((col, row))
+        return full_rows, score
+
+    # Removes all the tiles locked on the game grid
+    def clear(self):
+        self.value_plane[:, :] = 0
+        self.row_bits = [0] * self.grid_height
+        self.hash = 0
+        self.heights = [0] * self.grid_width
+        self.holes = 0
+        self.invalidate()
 
     # A method used for checking whether the cell with given row and column indexes
     # is inside the game grid or not
@@ -129,26 +398,47 @@ class GameGrid:
         for col in range(n_cols):
             for row in range(n_rows):
                 # place each tile (occupied cell) onto the game grid
-                if tiles_to_place[row][col] != None:
-                    pos = tiles_to_place[row][col].get_position()
-                    if self.is_inside(pos.y, pos.x):
-                        self.tile_matrix[pos.y][pos.x] = tiles_to_place[row][col]
+                tile = tiles_to_place[row][col]
+                if tile != None:
+                    if self.is_inside(tile.y, tile.x):
+                        self.set_tile(tile.y, tile.x, tile)
                     # the game is over if any placed tile is out of the game grid
                     else:
                         self.game_over = True
         # return the value of the game_over flag
         return self.game_over
 
-    # Moves the list of free tiles (tiles not connected to others) one unit downward.
-    def move_free_tiles(self, free_tiles):
-        for row in range(self.grid_height - 1):  # excluding the bottommost row
-            for col in range(self.grid_width):
-                if free_tiles[row][col]:
-                    free_tile_copy = copy.deepcopy(self.tile_matrix[row][col])
-                    self.tile_matrix[row - 1][col] = free_tile_copy
-                    dx, dy = 0, -1  # change of position in x and y directions
-                    self.tile_matrix[row - 1][col].move(dx, dy)
-                    self.tile_matrix[row][col] = None
+    # Moves the tiles down in one move by the number of rows given for each
+    # cell in drops (0 for the tiles that stay where they are)
+    def drop_tiles(self, drops):
+        rows, cols = np.nonzero(drops)
+        new_rows = rows - drops[rows, cols]
+        # remove all the moving tiles first so that none of them is overwritten
+        values = self.value_plane[rows, cols]
+        self.value_plane[rows, cols] = 0
+        self.value_plane[new_rows, cols] = values
+        # the keys of the moving tiles on their old and their new cells
+        keys = zobrist_keys(self.grid_height, self.grid_width)
+        self.hash ^= xor_keys(keys[rows, cols, values]) ^ xor_keys(keys[new_rows, cols, values])
+        # update the bits of the changed rows and the changed cells
+        for row in set(rows.tolist()) | set(new_rows.tolist()):
+            self.update_row_bits(row)
+        # the tiles only fall, so the top of each changed column is found by
+        # going down from its old top
+        for col in set(cols.tolist()):
+            self.set_height(col, self.column_top(col, self.heights[col]))
+        if self.debug:
+            self.check_skyline()
+        for row, new_row, col in zip(rows.tolist(), new_rows.tolist(), cols.tolist()):
+            self.dirty_cells.add((col, row))
+            self.dirty_cells.add((col, new_row))
+
+    # Computes the bits of the given row from the value plane again
+    def update_row_bits(self, row):
+        bits = 0
+        for col in np.nonzero(self.value_plane[row])[0].tolist():
+            bits |= 1 << col
+        self.row_bits[row] = bits
 
     # Draws the main score at the top right of the main game screen.
     def drawScore(self, score=0):
@@ -157,9 +447,10 @@ class GameGrid:
         text_to_display = "Score: " + str(score)
         stddraw.text(15.8, 18.8, text_to_display)
 
-    # Sets the following tetromino from the Game object to the right side.
-    def set_next(self, next_tetromino):
-        self.next_tetromino = next_tetromino
+    # Sets the following tetrominoes (in the order they enter the game grid)
+    # from the Game object to the right side.
+    def set_next(self, next_tetrominoes):
+        self.next_tetrominoes = next_tetrominoes
 
     # Displays the given information text on the screen along with a count.
     def display_info(self, txt, count):
@@ -168,15 +459,27 @@ class GameGrid:
         stddraw.setFontSize(20)
         text = str(txt) + " x " + str(count)
         stddraw.text(15.8, 18, text)
-        stddraw.text(15.8, 16.5, "Next Tetromino:")
+
+    # Sets the speed the game starts with (also after a restart) and the
+    # current speed to the given speed
+    def set_speed(self, speed):
+        self.start_speed = speed
+        self.game_speed = speed
+
+    # Restores the speed the game starts with and clears the speed increases
+    def reset_speed(self):
+        self.game_speed = self.start_speed
+        self.last_updated = 0
+        self.incr_counter = 0
 
     # Increases the game speed based on the total score, by 50 units for every 500 score.
     # The speed doesn't change if it's already less than 50.
+    # Returns whether the speed is increased.
     def change_speed(self):
         if self.last_updated > 500 and self.game_speed >= 50:
             rate = int(self.game_speed * 0.05)
-            print("Previous Speed:", self.game_speed)
             self.game_speed -= rate
-            print("New Speed:", self.game_speed)
             self.incr_counter += 1
-            self.last_updated = self.score % 500
\ No newline at end of file
+            self.last_updated = self.score % 500
+            return True
+        return False
\ No newline at end of file
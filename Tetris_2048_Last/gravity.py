@@ -0,0 +1,115 @@
+import numpy as np  # fundamental Python module for scientific computing
+from labeling import label_components, find_resting_tiles  # the components
+
+
+# Computes how far each free tile (a tile whose component does not touch the
+# bottommost row) falls, given the occupied cells as the bits of each row.
+# The free components fall together one row at a time and each of them stops
+# as soon as one of its tiles reaches the bottommost row or touches a resting
+# tile from above or from a side (it becomes connected to the resting tiles),
+# which is what dropping the free tiles by one row until none is left free
+# does. Instead of moving the tiles row by row, each round finds the distance
+# the next component falls before it stops and all the components are moved
+# by that distance at once, so there are at most as many rounds as the free
+# components. When emptied_cells (a list of (row, col)) is given, the grid
+# had no free tiles before these cells were emptied and only the components
+# next to them are searched (see find_free_components), otherwise all the
+# components are labeled. Returns a (height, width) array with the number of
+# rows each tile falls (0 for the tiles that stay where they are).
+def find_drops(row_bits, width, emptied_cells=None):
+    height = len(row_bits)
+    drops = np.zeros((height, width), dtype=int)
+    if emptied_cells is None:
+        labels = label_components(row_bits, width)
+        # the resting tiles are the components touching the bottommost row
+        resting = find_resting_tiles(labels)
+        # the cells (row indexes, column indexes) of each free component
+        components = [np.nonzero(labels == label)
+                      for label in np.unique(labels[(labels >= 0) & ~resting])]
+    else:
+        components = find_free_components(row_bits, width, emptied_cells)
+        if len(components) == 0:
+            return drops
+        # all the other tiles are resting
+        resting = (np.array(row_bits, dtype=np.int64).reshape(-1, 1) >>
+                   np.arange(width)) & 1 == 1
+        for rows, cols in components:
+            resting[rows, cols] = False
+    row_indexes = np.arange(height).reshape(-1, 1)
+    # the number of rows the free components have fallen so far
+    fallen = 0
+    while len(components) > 0:
+        # a falling tile stops in the cells of the bottommost row and in the
+        # cells above or next to a resting tile
+        stops = np.zeros((height, width), dtype=bool)
+        stops[0] = True
+        stops[1:] |= resting[:-1]
+        stops[:, 1:] |= resting[:, :-1]
+        stops[:, :-1] |= resting[:, 1:]
+        # the topmost stopping row at or below each cell
+        stop_rows = np.maximum.accumulate(np.where(stops, row_indexes, -1), axis=0)
+        # the distance each component can fall before one of its tiles stops
+        distances = []
+        for rows, cols in components:
+            distances.append(int((rows - fallen - stop_rows[rows - fallen, cols]).min()))
+        distance = min(distances)
+        fallen += distance
+        # the components that stop now become resting tiles, the others
+        # keep falling in the next round
+        falling = []
+        for component, component_distance in zip(components, distances):
+            rows, cols = component
+            if component_distance == distance:
+                drops[rows, cols] = fallen
+                resting[rows - fallen, cols] = True
+            else:
+                falling.append(component)
+        components = falling
+    return drops
+
+
+# Returns the free components (as (row indexes, column indexes) arrays) of a
+# grid with the occupied cells given as the bits of each row, when it had no
+# free tiles before the given cells (a list of (row, col)) were emptied. A tile
+# can only lose its way to the bottommost row through an emptied cell, so only
+# the components of the tiles next to the emptied cells can be free. Each of
+# them is searched going down first until it reaches the bottommost row or a
+# tile already found to be resting, which is usually after a few cells.
+def find_free_components(row_bits, width, emptied_cells):
+    height = len(row_bits)
+    # the cells found to be resting and the cells of the free components
+    resting, free = set(), set()
+    components = []
+    for row, col in emptied_cells:
+        for start in ((row + 1, col), (row - 1, col), (row, col - 1), (row, col + 1)):
+            start_row, start_col = start
+            if not (0 <= start_row < height and 0 <= start_col < width):
+                continue
+            if not row_bits[start_row] >> start_col & 1 or start in resting or start in free:
+                continue
+            seen = {start}
+            stack = [start]
+            grounded = False
+            while len(stack) > 0:
+                cell = stack.pop()
+                if cell[0] == 0 or cell in resting:
+                    grounded = True
+                    break
+                cell_row, cell_col = cell
+                # the cell below is pushed last so that it is searched first
+                for neighbor in ((cell_row + 1, cell_col), (cell_row, cell_col - 1),
+                                 (cell_row, cell_col + 1), (cell_row - 1, cell_col)):
+                    neighbor_row, neighbor_col = neighbor
+                    if (neighbor_row < height and 0 <= neighbor_col < width and
+                            row_bits[neighbor_row] >> neighbor_col & 1 and
+                            neighbor not in seen):
+                        seen.add(neighbor)
+                        stack.append(neighbor)
+            # the searched cells are all in the component of the start cell
+            if grounded:
+                resting |= seen
+            else:
+                free |= seen
+                rows, cols = zip(*seen)
+                components.append((np.array(rows), np.array(cols)))
+    return components
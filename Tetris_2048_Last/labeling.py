@@ -0,0 +1,63 @@
+import numpy as np  # fundamental Python module for scientific computing
+
+
+# Returns the root of the set that contains the given cell, halving the path
+# to the root on the way so that the later finds are faster
+def find_root(parent, cell):
+    while parent[cell] != cell:
+        parent[cell] = parent[parent[cell]]
+        cell = parent[cell]
+    return cell
+
+
+# Joins the sets that contain the given cells, the root of the set with the
+# smaller rank (the upper bound of its height) is attached to the other root
+def union(parent, rank, cell1, cell2):
+    root1, root2 = find_root(parent, cell1), find_root(parent, cell2)
+    if root1 == root2:
+        return
+    if rank[root1] < rank[root2]:
+        root1, root2 = root2, root1
+    parent[root2] = root1
+    if rank[root1] == rank[root2]:
+        rank[root1] += 1
+
+
+# Labels the 4-connected components of the occupied cells given as the bits of
+# each row (bit col of row_bits[row] is set when the cell is occupied) with a
+# union-find over the cells. Returns the labels as a (height, width) array where
+# the cells of a component share a label and the empty cells have -1.
+def label_components(row_bits, width):
+    height = len(row_bits)
+    parent = list(range(height * width))
+    rank = [0] * (height * width)
+    for row in range(height):
+        bits = row_bits[row]
+        below_bits = row_bits[row - 1] if row > 0 else 0
+        # join each occupied cell with its occupied left and below neighbors
+        while bits:
+            low_bit = bits & -bits
+            bits ^= low_bit
+            col = low_bit.bit_length() - 1
+            cell = row * width + col
+            if (row_bits[row] << 1) & low_bit:
+                union(parent, rank, cell, cell - 1)
+            if below_bits & low_bit:
+                union(parent, rank, cell, cell - width)
+    labels = np.full((height, width), -1, dtype=int)
+    for row in range(height):
+        bits = row_bits[row]
+        while bits:
+            low_bit = bits & -bits
+            bits ^= low_bit
+            col = low_bit.bit_length() - 1
+            labels[row, col] = find_root(parent, row * width + col)
+    return labels
+
+
+# Returns a (height, width) boolean array that is True for the occupied cells
+# of the components touching the bottommost row (the resting tiles), given the
+# labels of the components (see label_components)
+def find_resting_tiles(labels):
+    grounded_labels = labels[0][labels[0] >= 0]
+    return (labels >= 0) & np.isin(labels, grounded_labels)
@@ -12,6 +12,10 @@ class Color:
     A Color object models an RGB color.
     """
 
+    # Color objects have no __dict__, so that the many Color objects
+    # used as constants are small.
+    __slots__ = ('_r', '_g', '_b')
+
     #-------------------------------------------------------------------
 
     def __init__(self, r=0, g=0, b=0):
@@ -10,6 +10,7 @@ commonly used Color objects defined in the color module.
 import time
 import os
 import sys
+import collections
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = 'hide'
 import pygame
@@ -83,6 +84,9 @@ _DEFAULT_PEN_COLOR = BLACK
 _DEFAULT_FONT_FAMILY = 'Helvetica'
 _DEFAULT_FONT_SIZE = 12
 
+# The maximum number of rendered text surfaces kept for reuse
+_TEXT_CACHE_SIZE = 512
+
 _xmin = None
 _ymin = None
 _xmax = None
@@ -97,6 +101,15 @@ _penRadius = None
 _penColor = _DEFAULT_PEN_COLOR
 _keysTyped = []
 
+# Fonts keyed by (family, size, bold), and rendered text surfaces keyed by
+# (string, family, size, bold, color) in least recently used order
+_fonts = {}
+_textSurfaces = collections.OrderedDict()
+
+# Drawings kept as surfaces by sprite() and layer() keyed by the given keys,
+# discarded when the canvas size or scale changes
+_sprites = {}
+
 # Has the window been created?
 _windowCreated = False
 
@@ -144,6 +157,16 @@ def _factorX(w):
 def _factorY(h):
     return h * _canvasHeight / abs(_ymax - _ymin)
 
+def _pixelRect(x, y, w, h):
+    """
+    Return the pygame.Rect of the pixels covered by the rectangle of
+    width w and height h whose lower left point is (x, y).
+    """
+    xs = int(round(_scaleX(x)))
+    ys = int(round(_scaleY(y + h)))
+    return pygame.Rect(xs, ys,
+        int(round(_scaleX(x + w))) - xs, int(round(_scaleY(y))) - ys)
+
 #-----------------------------------------------------------------------
 # Begin added by Alan J. Broder
 #-----------------------------------------------------------------------
@@ -180,6 +203,7 @@ def setCanvasSize(w=_DEFAULT_CANVAS_SIZE, h=_DEFAULT_CANVAS_SIZE):
 
     _canvasWidth = w
     _canvasHeight = h
+    _sprites.clear()
     _background = pygame.display.set_mode([w, h])
     pygame.display.set_caption('stddraw window (r-click to save)')
     _surface = pygame.Surface((w, h))
@@ -200,6 +224,7 @@ def setXscale(min=_DEFAULT_XMIN, max=_DEFAULT_XMAX):
     size = max - min
     _xmin = min - _BORDER * size
     _xmax = max + _BORDER * size
+    _sprites.clear()
 
 def setYscale(min=_DEFAULT_YMIN, max=_DEFAULT_YMAX):
     """
@@ -215,6 +240,7 @@ def setYscale(min=_DEFAULT_YMIN, max=_DEFAULT_YMAX):
     size = max - min
     _ymin = min - _BORDER * size
     _ymax = max + _BORDER * size
+    _sprites.clear()
 
 def setPenRadius(r=_DEFAULT_PEN_RADIUS):
     """
@@ -480,6 +506,36 @@ def filledPolygon(x, y):
     points.append((xScaled[0], yScaled[0]))
     pygame.draw.polygon(_surface, _pygameColor(_penColor), points, 0)
 
+def _font(bold=False):
+    """
+    Return the font with the current font family and size (bold if
+    bold is True). Each font is looked up only once and then reused.
+    """
+    key = (_fontFamily, _fontSize, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(_fontFamily, _fontSize, bold)
+        _fonts[key] = font
+    return font
+
+def _renderText(s, bold=False):
+    """
+    Return a surface with string s rendered with the current font and
+    pen color. The surfaces are reused from a cache that keeps the
+    _TEXT_CACHE_SIZE most recently used ones.
+    """
+    key = (s, _fontFamily, _fontSize, bold,
+        _penColor.getRed(), _penColor.getGreen(), _penColor.getBlue())
+    text = _textSurfaces.get(key)
+    if text is not None:
+        _textSurfaces.move_to_end(key)
+        return text
+    text = _font(bold).render(s, 1, _pygameColor(_penColor))
+    _textSurfaces[key] = text
+    if len(_textSurfaces) > _TEXT_CACHE_SIZE:
+        _textSurfaces.popitem(last=False)
+    return text
+
 def text(x, y, s):
     """
     Draw string s on the background canvas centered at (x, y).
@@ -489,8 +545,7 @@ def text(x, y, s):
     y = float(y)
     xs = _scaleX(x)
     ys = _scaleY(y)
-    font = pygame.font.SysFont(_fontFamily, _fontSize)
-    text = font.render(s, 1, _pygameColor(_penColor))
+    text = _renderText(s)
     textpos = text.get_rect(center=(xs, ys))
     _surface.blit(text, textpos)
 
@@ -503,8 +558,7 @@ def boldText(x, y, s):
     y = float(y)
     xs = _scaleX(x)
     ys = _scaleY(y)
-    font = pygame.font.SysFont(_fontFamily, _fontSize, True)
-    text = font.render(s, 1, _pygameColor(_penColor))
+    text = _renderText(s, True)
     textpos = text.get_rect(center=(xs, ys))
     _surface.blit(text, textpos)
 
@@ -530,6 +584,77 @@ def picture(pic, x=None, y=None):
     picSurface = pic._surface # violates encapsulation
     _surface.blit(picSurface, [xs-ws/2.0, ys-hs/2.0, ws, hs])
 
+def sprite(key, x, y, w, h, draw):
+    """
+    Draw on the background canvas a drawing of width w and height h
+    centered at (x, y). The first time key is used, the drawing is made
+    by calling draw, which draws it centered at (0, 0) with the other
+    functions of this module, and it is kept as a surface that is then
+    copied to the canvas in one operation. The kept drawings are made
+    again after the canvas size or scale changes.
+    """
+    global _surface
+    global _canvasWidth
+    global _canvasHeight
+    global _xmin
+    global _xmax
+    global _ymin
+    global _ymax
+    _makeSureWindowCreated()
+    spriteSurface = _sprites.get(key)
+    if spriteSurface is None:
+        ws = max(1, int(round(_factorX(w))))
+        hs = max(1, int(round(_factorY(h))))
+        spriteSurface = pygame.Surface((ws, hs), pygame.SRCALPHA)
+        # draw on the sprite surface as if it was a canvas showing the
+        # w-by-h area around (0, 0)
+        saved = (_surface, _canvasWidth, _canvasHeight,
+            _xmin, _xmax, _ymin, _ymax)
+        _surface = spriteSurface
+        _canvasWidth, _canvasHeight = ws, hs
+        _xmin, _xmax = -w / 2.0, w / 2.0
+        _ymin, _ymax = -h / 2.0, h / 2.0
+        try:
+            draw()
+        finally:
+            (_surface, _canvasWidth, _canvasHeight,
+                _xmin, _xmax, _ymin, _ymax) = saved
+        _sprites[key] = spriteSurface
+    xs = _scaleX(float(x)) - spriteSurface.get_width() / 2.0
+    ys = _scaleY(float(y)) - spriteSurface.get_height() / 2.0
+    _surface.blit(spriteSurface, (int(round(xs)), int(round(ys))))
+
+def layer(key, draw, region=None):
+    """
+    Draw on the background canvas a drawing that covers the whole
+    canvas. The first time key is used, the drawing is made by calling
+    draw, which draws it with the other functions of this module on a
+    transparent surface, and it is kept as a surface that is then
+    copied to the canvas in one operation. The kept drawings are made
+    again after the canvas size or scale changes. If region is given as
+    (x, y, w, h), only the part of the drawing inside the rectangle of
+    width w and height h whose lower left point is (x, y) is copied.
+    """
+    global _surface
+    _makeSureWindowCreated()
+    layerSurface = _sprites.get(key)
+    if layerSurface is None:
+        layerSurface = pygame.Surface(
+            (int(_canvasWidth), int(_canvasHeight)), pygame.SRCALPHA)
+        saved = _surface
+        _surface = layerSurface
+        try:
+            draw()
+        finally:
+            _surface = saved
+        layerSurface = layerSurface.convert_alpha()
+        _sprites[key] = layerSurface
+    if region is None:
+        _surface.blit(layerSurface, (0, 0))
+    else:
+        rect = _pixelRect(*region)
+        _surface.blit(layerSurface, rect, rect)
+
 def clear(c=WHITE):
     """
     Clear the background canvas to color c, where c is an
@@ -558,12 +683,20 @@ def save(f):
 
 #-----------------------------------------------------------------------
 
-def _show():
+def _show(regions=None):
     """
-    Copy the background canvas to the window canvas.
+    Copy the background canvas to the window canvas. If regions is
+    given as a list of (x, y, w, h) rectangles, only the parts of the
+    canvas inside these rectangles are copied.
     """
-    _background.blit(_surface, (0, 0))
-    pygame.display.flip()
+    if regions is None:
+        _background.blit(_surface, (0, 0))
+        pygame.display.flip()
+    else:
+        rects = [_pixelRect(*region) for region in regions]
+        for rect in rects:
+            _background.blit(_surface, rect, rect)
+        pygame.display.update(rects)
     _checkForEvents()
 
 def _showAndWaitForever():
@@ -578,16 +711,18 @@ def _showAndWaitForever():
         time.sleep(QUANTUM)
         _checkForEvents()
 
-def show(msec=float('inf')):
+def show(msec=float('inf'), regions=None):
     """
     Copy the background canvas to the window canvas, and
     then wait for msec milliseconds. msec defaults to infinity.
+    If regions is given as a list of (x, y, w, h) rectangles, only the
+    parts of the canvas inside these rectangles are copied.
     """
     if msec == float('inf'):
         _showAndWaitForever()
 
     _makeSureWindowCreated()
-    _show()
+    _show(regions)
     _checkForEvents()
 
     # Sleep for the required time, but check for events every
@@ -650,7 +785,16 @@ def _checkForEvents():
     Check if any new event has occured (such as a key typed or button
     pressed).  If a key has been typed, then put that key in a queue.
     """
-    global _surface
+    _makeSureWindowCreated()
+
+    for event in pygame.event.get():
+        _handleEvent(event)
+
+def _handleEvent(event):
+    """
+    Handle the given event. If a key has been typed, then put that key
+    in a queue.
+    """
     global _keysTyped
     
     #-------------------------------------------------------------------
@@ -661,30 +805,49 @@ def _checkForEvents():
     #-------------------------------------------------------------------
     # End added by Alan J. Broder
     #-------------------------------------------------------------------
-    
-    _makeSureWindowCreated()
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-        elif event.type == pygame.KEYDOWN:
-            _keysTyped = [pygame.key.name(event.key)] + _keysTyped
-        elif (event.type == pygame.MOUSEBUTTONUP) and \
-            (event.button == 3):
-            _saveToFile()
-            
-        #---------------------------------------------------------------
-        # Begin added by Alan J. Broder
-        #---------------------------------------------------------------
-        # Every time the mouse button is pressed, remember
-        # the mouse position as of that press.
-        elif (event.type == pygame.MOUSEBUTTONDOWN) and \
-            (event.button == 1): 
-            _mousePressed = True
-            _mousePos = event.pos                      
-        #---------------------------------------------------------------
-        # End added by Alan J. Broder
-        #---------------------------------------------------------------
+    if event.type == pygame.QUIT:
+        sys.exit()
+    elif event.type == pygame.KEYDOWN:
+        _keysTyped = [pygame.key.name(event.key)] + _keysTyped
+    elif (event.type == pygame.MOUSEBUTTONUP) and \
+        (event.button == 3):
+        _saveToFile()
+        
+    #-------------------------------------------------------------------
+    # Begin added by Alan J. Broder
+    #-------------------------------------------------------------------
+    # Every time the mouse button is pressed, remember
+    # the mouse position as of that press.
+    elif (event.type == pygame.MOUSEBUTTONDOWN) and \
+        (event.button == 1): 
+        _mousePressed = True
+        _mousePos = event.pos                      
+    #-------------------------------------------------------------------
+    # End added by Alan J. Broder
+    #-------------------------------------------------------------------
+    # Copy the canvas to the window again when the window needs it
+    elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+        pygame.display.flip()
+
+def waitForEvent(msec=None):
+    """
+    Wait until an event occurs (such as a key typed or button pressed)
+    without using the processor, or until msec milliseconds have passed
+    if msec is not None. Then handle the events like show does. Return
+    True if an event occured, and False otherwise.
+    """
+    _makeSureWindowCreated()
+    if msec is None:
+        event = pygame.event.wait()
+    else:
+        # a timeout of 0 would wait forever
+        event = pygame.event.wait(max(int(msec), 1))
+    if event.type == pygame.NOEVENT:
+        return False
+    _handleEvent(event)
+    _checkForEvents()
+    return True
 
 #-----------------------------------------------------------------------
 
@@ -0,0 +1,40 @@
+import tracemalloc  # used for measuring the memory allocated by Python
+import random  # used for the random positions of the tetrominoes
+from point import Point  # the class for the positions of the tiles
+from tile import Tile  # the class for modeling the numbered tiles
+from tetromino import Tetromino  # the class for modeling the tetrominoes
+
+# the memory (in bytes) each tile (with its position) should take at most
+TARGET_BYTES_PER_TILE = 160
+
+
+# Returns the average memory (in bytes) allocated for creating each of the
+# given number of objects with the given function
+def bytes_per_object(create, count):
+    # create one object first, so that the memory allocated only once (such
+    # as the class variables and the caches) is not counted
+    create(0)
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [create(i) for i in range(count)]
+    allocated = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    # the list holding the objects is not a part of them
+    return (allocated - objects.__sizeof__()) / count
+
+
+# Measures the memory of the tiles and the tetrominoes and reports whether the
+# memory of each tile is within the target
+def main(count=10000):
+    tile_bytes = bytes_per_object(lambda i: Tile(Point(i % 12, i // 12)), count)
+    columns = random.Random(0)
+    tetromino_bytes = bytes_per_object(lambda i: Tetromino("T", 20, 12, columns), count // 4)
+    print("Tile (with its position): %.1f bytes" % tile_bytes)
+    print("Tetromino (with its 4 tiles): %.1f bytes" % tetromino_bytes)
+    print("Target: %d bytes per tile (%s)" % (TARGET_BYTES_PER_TILE,
+          "met" if tile_bytes <= TARGET_BYTES_PER_TILE else "NOT met"))
+    return tile_bytes <= TARGET_BYTES_PER_TILE
+
+
+if __name__ == "__main__":
+    main()
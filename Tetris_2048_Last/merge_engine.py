@@ -0,0 +1,50 @@
+import numpy as np  # fundamental Python module for scientific computing
+
+
+# Merges the vertically adjacent tiles with the same number on the given value
+# plane (a 2D array with the log2 of the numbers on the tiles and 0 for the
+# empty cells, row 0 is the bottommost row) in place, until there are no tiles
+# to merge. When two tiles merge, the below tile gets the sum (its log2 is
+# increased by 1) and the above tile is removed. Each pass scans the columns
+# from bottom to top like the merge rules of the game, so in a run of tiles
+# with the same number the tiles are merged in pairs starting from the bottom
+# (2, 2, 2 -> 4, _, 2), and the next pass merges the new numbers with their
+# neighbors (4, 4, _ -> 8, _, _).
+# When columns (a sorted list of column indexes) is not None, only a copy of
+# the given columns is merged and values is left as it is, so the merges can
+# be applied to the game grid by the caller. Returns the score gained (the sum
+# of the new numbers) and the merges as a list of (row, col, number) in the
+# order they are made.
+def merge_tiles(values, columns=None):
+    if columns is not None:
+        # merge a copy of the given columns
+        score, merges = merge_tiles(values[:, columns])
+        return score, [(row, columns[col], number) for row, col, number in merges]
+    score = 0
+    merges = []
+    rows = np.arange(values.shape[0]).reshape(-1, 1)
+    while True:
+        # same[r] is True when the tile in row r has the same number as the
+        # tile right below it (row r - 1)
+        same = np.zeros(values.shape, dtype=bool)
+        same[1:] = (values[1:] != 0) & (values[1:] == values[:-1])
+        if not same.any():
+            break
+        # index of each tile in its run of tiles with the same number, the
+        # run starts where same is False
+        run_start = np.maximum.accumulate(np.where(same, 0, rows), axis=0)
+        index_in_run = rows - run_start
+        # the below tiles of the pairs: an even index in the run and a tile
+        # with the same number right above
+        below = np.zeros(values.shape, dtype=bool)
+        below[:-1] = same[1:] & (index_in_run[:-1] % 2 == 0)
+        above = np.zeros(values.shape, dtype=bool)
+        above[1:] = below[:-1]
+        # merge the pairs
+        values[below] += 1
+        values[above] = 0
+        for row, col in zip(*np.nonzero(below)):
+            number = 1 << int(values[row, col])
+            score += number
+            merges.append((int(row), int(col), number))
+    return score, merges
@@ -0,0 +1,48 @@
+from tetromino import Tetromino, shapes  # the class and the shapes of the tetrominoes
+
+# the types (shapes) of the tetrominoes
+tetromino_types = tuple(shapes)
+
+# the ways of choosing the types of the tetrominoes: "bag" gives bags of all
+# the 7 types in a random order (7-bag), so each type comes once in every 7
+# tetrominoes, and "uniform" chooses each type randomly
+randomizers = ("bag", "uniform")
+
+
+# A class for giving out the tetrominoes to enter the game grid endlessly
+# (as an iterator) with the types given by the randomizer with the given name,
+# each tetromino is created only when it is asked for (when it enters the
+# preview queue). The random values are taken from the given streams (see
+# random_streams.RandomStreams). All its state is kept in its attributes, so
+# that it can be copied with the rest of a game (e.g. for replay keyframes).
+class PieceSource:
+    # A constructor for creating the source of the tetrominoes
+    def __init__(self, randomizer, grid_height, grid_width, streams):
+        if randomizer not in randomizers:
+            raise ValueError("unknown randomizer: " + str(randomizer))
+        self.randomizer = randomizer
+        self.grid_height = grid_height
+        self.grid_width = grid_width
+        self.streams = streams
+        # the types left in the current bag (for the "bag" randomizer)
+        self.bag = []
+
+    def __iter__(self):
+        return self
+
+    # Creates and returns the next tetromino
+    def __next__(self):
+        return Tetromino(self.next_type(), self.grid_height, self.grid_width,
+                         self.streams.columns, self.streams.tile_values)
+
+    # Returns the type of the next tetromino
+    def next_type(self):
+        rng = self.streams.pieces
+        if self.randomizer == "uniform":
+            return rng.choice(tetromino_types)
+        # start a new bag when all the types in the current bag are given out
+        if len(self.bag) == 0:
+            self.bag = list(tetromino_types)
+            rng.shuffle(self.bag)
+            self.bag.reverse()
+        return self.bag.pop()
@@ -0,0 +1,43 @@
+import functools  # used for creating the table of each board width once
+from tetromino import orientations  # the orientations of the tetrominoes
+
+
+# Returns the placements of a tetromino of the given type on a board of the
+# given width as a tuple of (orientation, x, columns, bottoms) for each
+# orientation with a different shape and each x (the column of the bottom left
+# cell of its tile matrix) that keeps the tetromino inside the board, where
+# columns are the board columns the tetromino covers (its footprint) and
+# bottoms are the offsets (dy) of its lowest cell in each of these columns from
+# the bottom left cell of its tile matrix (its bottom profile)
+@functools.lru_cache(maxsize=None)
+def placement_table(type, width):
+    table = []
+    # the shapes (offsets moved to the bottom left) of the orientations added
+    shapes = []
+    for orientation, (cells, offsets, masks, bounds) in enumerate(orientations[type]):
+        min_dx, max_dx, min_dy = bounds
+        shape = frozenset((dx - min_dx, dy - min_dy) for dx, dy in offsets)
+        # the orientations with the same shape have the same placements
+        if shape in shapes:
+            continue
+        shapes.append(shape)
+        bottoms = {}
+        for dx, dy in offsets:
+            bottoms[dx] = min(dy, bottoms.get(dx, dy))
+        for x in range(-min_dx, width - max_dx):
+            table.append((orientation, x,
+                          tuple(x + dx for dx in sorted(bottoms)),
+                          tuple(bottoms[dx] for dx in sorted(bottoms))))
+    return tuple(table)
+
+
+# Yields the landing spots of a tetromino of the given type dropped from above
+# onto a board with the given column heights (the row index of the topmost
+# tile of each column + 1, 0 for the empty columns, see GameGrid.column_heights)
+# as (orientation, x, y), where (x, y) is the bottom left cell of its tile
+# matrix. The tetromino lands where its bottom profile first touches the column
+# heights, that is the lowest y for which every cell is above its column.
+def landing_spots(type, heights):
+    for orientation, x, columns, bottoms in placement_table(type, len(heights)):
+        y = max(heights[col] - bottom for col, bottom in zip(columns, bottoms))
+        yield orientation, x, y
@@ -0,0 +1,27 @@
+import random  # used for the random generators of the pieces and the columns
+import numpy as np  # used for seeding the independent random streams
+from tile_values import TileValues  # used for the numbers of the new tiles
+
+
+# A class for holding all the randomness of a game, created from one seed: the
+# types of the tetrominoes (pieces), the columns the tetrominoes enter the game
+# grid at (columns) and the numbers of the new tiles (tile_values) come from
+# independent streams, so a game can be reproduced from its seed and the
+# streams of different games (with different seeds) are not correlated
+class RandomStreams:
+    # A constructor for creating the streams from the given seed (a random
+    # seed if it is None, which is then kept in seed), four_probability is
+    # the probability of a new tile having 4 (the others have 2)
+    def __init__(self, seed=None, four_probability=0.5):
+        seed_sequence = np.random.SeedSequence(seed)
+        self.seed = seed_sequence.entropy
+        pieces_seed, columns_seed, values_seed = seed_sequence.spawn(3)
+        self.pieces = random.Random(self.seed_of(pieces_seed))
+        self.columns = random.Random(self.seed_of(columns_seed))
+        self.tile_values = TileValues(four_probability,
+                                      generator=np.random.default_rng(values_seed))
+
+    # Returns an integer seed for a random.Random from the given seed sequence
+    @staticmethod
+    def seed_of(seed_sequence):
+        return int.from_bytes(seed_sequence.generate_state(4).tobytes(), "little")
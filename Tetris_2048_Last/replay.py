@@ -0,0 +1,153 @@
+import copy  # used for copying the engine for the keyframes
+import struct  # used for the binary format of the replays
+import sys  # used for the command line arguments
+import time  # used for measuring the playback speed
+from game_engine import GameEngine  # the class for running the game rules
+from piece_source import randomizers  # the names of the randomizers
+
+# A replay file starts with MAGIC and a header with the settings of the engine
+# (grid height, grid width, game width, randomizer index, preview depth, lock
+# delay and the number of bytes of the seed) followed by the seed. Then come
+# the inputs as (tick, code) records, where tick is the number of the ticks run
+# before the input is applied, and a speed record is followed by the speed.
+MAGIC = b"T2048REP"
+HEADER = struct.Struct("<HHHBBHH")
+RECORD = struct.Struct("<IB")
+SPEED = struct.Struct("<H")
+# the codes of the inputs, "end" is the last record and gives the last tick
+codes = {"end": 0, "left": 1, "right": 2, "down": 3, "up": 4, "restart": 5,
+         "speed": 6, "space": 7}
+inputs = {code: input for input, code in codes.items()}
+
+
+# A class for recording the inputs given to an engine into a replay file
+class ReplayRecorder:
+    # A constructor for starting a replay file with the name file_name for
+    # the given engine (before any tick is run)
+    def __init__(self, file_name, engine):
+        self.file = open(file_name, "wb")
+        seed = engine.seed.to_bytes((engine.seed.bit_length() + 7) // 8, "little")
+        self.file.write(MAGIC)
+        self.file.write(HEADER.pack(engine.grid_height, engine.grid_width,
+                                    engine.game_width,
+                                    randomizers.index(engine.randomizer),
+                                    engine.preview_depth, engine.lock_delay,
+                                    len(seed)))
+        self.file.write(seed)
+        self.last_tick = 0
+
+    # Records the given input (an action of the engine, "restart" or "speed"
+    # with the new game speed as value) given before the tick with the number
+    # tick (the number of the ticks run so far)
+    def record(self, tick, input, value=None):
+        self.file.write(RECORD.pack(tick, codes[input]))
+        if input == "speed":
+            self.file.write(SPEED.pack(value))
+        self.last_tick = tick
+
+    # Ends the replay file at the given tick
+    def close(self, tick=None):
+        if self.file.closed:
+            return
+        self.record(self.last_tick if tick is None else tick, "end")
+        self.file.close()
+
+
+# A class for playing a replay file again on a new engine without drawing or
+# waiting, a copy of the engine (keyframe) is kept every keyframe_interval
+# ticks so that the playback can jump back to any tick quickly
+class ReplayPlayer:
+    # A constructor for loading the replay file with the name file_name
+    def __init__(self, file_name, keyframe_interval=1000):
+        with open(file_name, "rb") as file:
+            data = file.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a replay file: " + str(file_name))
+        offset = len(MAGIC)
+        (grid_h, grid_w, game_w, randomizer, preview_depth, lock_delay,
+         seed_size) = HEADER.unpack_from(data, offset)
+        offset += HEADER.size
+        self.seed = int.from_bytes(data[offset:offset + seed_size], "little")
+        offset += seed_size
+        self.settings = (grid_h, grid_w, game_w, randomizers[randomizer],
+                         preview_depth, lock_delay)
+        # the records as (tick, input, value)
+        self.records = []
+        while offset < len(data):
+            tick, code = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            value = None
+            if inputs[code] == "speed":
+                value = SPEED.unpack_from(data, offset)[0]
+                offset += SPEED.size
+            self.records.append((tick, inputs[code], value))
+        self.last_tick = self.records[-1][0] if len(self.records) > 0 else 0
+        self.keyframe_interval = keyframe_interval
+        # the keyframes as tick -> (index of the next record, engine)
+        self.keyframes = {}
+        self.rewind()
+
+    # Starts the playback again from the beginning
+    def rewind(self):
+        grid_h, grid_w, game_w, randomizer, preview_depth, lock_delay = self.settings
+        self.engine = GameEngine(grid_h, grid_w, game_w, randomizer,
+                                 preview_depth, self.seed)
+        self.engine.lock_delay = lock_delay
+        self.record_index = 0
+        self.keyframes[0] = (0, copy.deepcopy(self.engine))
+
+    # Runs the ticks until the given tick (the end of the replay if it is
+    # None) is reached and returns the events of these ticks
+    def play(self, until_tick=None):
+        if until_tick is None:
+            until_tick = self.last_tick
+        engine = self.engine
+        events = []
+        while engine.tick_count < until_tick:
+            # apply the inputs given before this tick
+            actions = []
+            while (self.record_index < len(self.records) and
+                   self.records[self.record_index][0] <= engine.tick_count):
+                tick, input, value = self.records[self.record_index]
+                self.record_index += 1
+                if input == "restart":
+                    engine.restart()
+                elif input == "speed":
+                    engine.grid.set_speed(value)
+                elif input != "end":
+                    actions.append(input)
+            events.extend(engine.tick(actions))
+            if engine.tick_count % self.keyframe_interval == 0:
+                self.keyframes[engine.tick_count] = (self.record_index,
+                                                     copy.deepcopy(engine))
+        return events
+
+    # Jumps to the given tick, starting from the last keyframe before it when
+    # the tick is behind the current tick, and returns the engine at that tick
+    def seek(self, tick):
+        if tick < self.engine.tick_count:
+            keyframe_tick = max(t for t in self.keyframes if t <= tick)
+            record_index, engine = self.keyframes[keyframe_tick]
+            # the keyframe is copied so that it stays as it is
+            self.record_index = record_index
+            self.engine = copy.deepcopy(engine)
+        self.play(tick)
+        return self.engine
+
+
+# Plays the replay file given on the command line to its end (or to the tick
+# given after it) as fast as possible and reports the result
+def main():
+    player = ReplayPlayer(sys.argv[1])
+    until_tick = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    start = time.perf_counter()
+    player.play(until_tick)
+    seconds = time.perf_counter() - start
+    engine = player.engine
+    print("Seed:", player.seed)
+    print("Ticks:", engine.tick_count, "(%.0f ticks per second)" % (engine.tick_count / max(seconds, 1e-9)))
+    print("Score:", engine.grid.score)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,105 @@
 from tile import Tile  # used for representing each tile on the tetromino
 from point import Point  # used for tile positions
 import numpy as np  # fundamental Python module for scientific computing
-import random  # the random module is used for generating random values
 
-# A class for modeling tetrominoes with 3 out of 7 different types as I, O and Z
+# The size n of the tile matrix (n = number of rows = number of columns) and the
+# occupied cells (column_index, row_index) of each type of tetromino in its
+# initial orientation (see the documentation given with this code)
+shapes = {
+    'I': (4, ((1, 0), (1, 1), (1, 2), (1, 3))),
+    'O': (2, ((0, 0), (1, 0), (0, 1), (1, 1))),
+    'Z': (3, ((0, 0), (1, 0), (1, 1), (2, 1))),
+    'J': (3, ((0, 0), (2, 0), (1, 0), (2, 1))),
+    'L': (3, ((0, 0), (2, 0), (1, 0), (0, 1))),
+    'T': (3, ((0, 0), (2, 0), (1, 0), (1, 1))),
+    'S': (3, ((0, 1), (2, 0), (1, 0), (1, 1))),
+}
+
+
+# Computes the four orientations of a tetromino with the given tile matrix size
+# and occupied cells, each one rotated clockwise from the previous one. Each
+# orientation is a tuple (cells, offsets, masks, bounds) where
+# - cells are the occupied cells (column_index, row_index) of the tile matrix,
+#   the i-th cell of each orientation holds the same tile,
+# - offsets are the positions (dx, dy) of these cells relative to the bottom
+#   left cell of the tile matrix,
+# - masks are the occupied cells as bits of each row of the tile matrix from
+#   bottom to top (bit i is the column min_dx + i),
+# - bounds are (min_dx, max_dx, min_dy) of the offsets.
+def compute_orientations(n, cells):
+    orientations = []
+    for i in range(4):
+        offsets = tuple((col, n - 1 - row) for col, row in cells)
+        min_dx = min(dx for dx, dy in offsets)
+        max_dx = max(dx for dx, dy in offsets)
+        min_dy = min(dy for dx, dy in offsets)
+        masks = [0] * n
+        for dx, dy in offsets:
+            masks[dy] |= 1 << (dx - min_dx)
+        orientations.append((cells, offsets, tuple(masks), (min_dx, max_dx, min_dy)))
+        # rotating the tile matrix clockwise moves the cell in row r and column
+        # c to row c and column n - 1 - r
+        cells = tuple((n - 1 - row, col) for col, row in cells)
+    return tuple(orientations)
+
+
+# Computes the wall kicks tried in order when rotating a tetromino whose tile
+# matrix has the given size: no shift first, then shifts to the right and to
+# the left by up to half the size (enough for leaving a wall)
+def compute_kicks(n):
+    kicks = [(0, 0)]
+    for dx in range(1, n // 2 + 1):
+        kicks.append((dx, 0))
+        kicks.append((-dx, 0))
+    return tuple(kicks)
+
+
+# Computes the offset (dx, dy) from the bottom left cell of the tile matrix of
+# the pivot cell of a tetromino with the given tile matrix size and occupied
+# cells in its initial orientation, that is the first occupied one of the top
+# left cell, the cell right of it and the cell below it (see move_pos)
+def compute_pivot(n, cells):
+    for col, row in ((0, 0), (1, 0), (0, 1)):
+        if (col, row) in cells:
+            return col, n - 1 - row
+
+
+# The orientations, the wall kicks and the pivots of each type of tetromino,
+# computed once
+orientations = {type: compute_orientations(n, cells)
+                for type, (n, cells) in shapes.items()}
+kicks = {type: compute_kicks(n) for type, (n, cells) in shapes.items()}
+pivots = {type: compute_pivot(n, cells) for type, (n, cells) in shapes.items()}
+
+
+# A class for modeling tetrominoes with 7 different types as I, O, Z, J, L, T and S
 class Tetromino:
-    # A constructor for creating a tetromino with a given shape (type)
-    def __init__(self, type, grid_height, grid_width, is_next=False):
+    # the attributes of each tetromino (no per-tetromino __dict__)
+    __slots__ = ("type", "grid_height", "grid_width", "occupied_cells",
+                 "orientation", "tile_matrix", "bottom_left_corner")
+
+    # A constructor for creating a tetromino with a given shape (type), its
+    # random horizontal position is chosen by the random generator columns (a
+    # random.Random) and the numbers of its tiles are taken from values (a
+    # TileValues, the shared one of the tiles if it is None)
+    def __init__(self, type, grid_height, grid_width, columns, values=None):
         self.type = type
 
         self.grid_height = grid_height
         self.grid_width = grid_width
         # determine the occupied (non-empty) cells in the tile matrix based on
-        # the shape of this tetromino (see the documentation given with this code)
-        self.occupied_cells = []
-        if type == 'I':
-            n = 4  # n = number of rows = number of columns in the tile matrix
-            # shape of the tetromino I in its initial orientation
-            self.occupied_cells.append((1, 0))  # (column_index, row_index)
-            self.occupied_cells.append((1, 1))
-            self.occupied_cells.append((1, 2))
-            self.occupied_cells.append((1, 3))
-        elif type == 'O':
-            n = 2  # n = number of rows = number of columns in the tile matrix
-            # shape of the tetromino O in its initial orientation
-            self.occupied_cells.append((0, 0))
-            self.occupied_cells.append((1, 0))
-            self.occupied_cells.append((0, 1))
-            self.occupied_cells.append((1, 1))
-        elif type == 'Z':
-            n = 3  # n = number of rows = number of columns in the tile matrix
-            # shape of the tetromino Z in its initial orientation
-            self.occupied_cells.append((0, 0))
-            self.occupied_cells.append((1, 0))
-            self.occupied_cells.append((1, 1))
-            self.occupied_cells.append((2, 1))
-        elif type == 'J':
-            n = 3  # n = number of rows = number of columns in the tile matrix
-            # shape of the tetromino J in its initial orientation
-            self.occupied_cells.append((0, 0))
-            self.occupied_cells.append((2, 0))
-            self.occupied_cells.append((1, 0))
-            self.occupied_cells.append((2, 1))
-        elif type == 'L':
-            n = 3  # n = number of rows = number of columns in the tile matrix
-            # shape of the tetromino L in its initial orientation
-            self.occupied_cells.append((0, 0))
-            self.occupied_cells.append((2, 0))
-            self.occupied_cells.append((1, 0))
-            self.occupied_cells.append((0, 1))
-        elif type == 'T':
-            n = 3  # n = number of rows = number of columns in the tile matrix
-            # shape of the tetromino T in its initial orientation
-            self.occupied_cells.append((0, 0))
-            self.occupied_cells.append((2, 0))
-            self.occupied_cells.append((1, 0))
-            self.occupied_cells.append((1, 1))
-        elif type == 'S':
-            n = 3  # n = number of rows = number of columns in the tile matrix
-            # shape of the tetromino S in its initial orientation
-            self.occupied_cells.append((0, 1))
-            self.occupied_cells.append((2, 0))
-            self.occupied_cells.append((1, 0))
-            self.occupied_cells.append((1, 1))
+        # the shape of this tetromino (see the shapes given above)
+        n = shapes[type][0]  # n = number of rows = number of columns
+        self.occupied_cells = list(shapes[type][1])
+        # the index of the current orientation in the orientations of the type
+        self.orientation = 0
         # create a matrix of numbered tiles based on the shape of the tetromino
         self.tile_matrix = np.full((n, n), None)
         # initialize the position of this tetromino (as the bottom left cell in
         # the tile matrix) with a random horizontal position above the game grid
         self.bottom_left_corner = Point()
         self.bottom_left_corner.y = grid_height
-        self.bottom_left_corner.x = random.randint(0, grid_width - n)
+        self.bottom_left_corner.x = columns.randint(0, grid_width - n)
 
         # create the four tiles (minos) of this tetromino and place these tiles
         # into the tile matrix
@@ -78,7 +108,7 @@ class Tetromino:
             position = Point()
             position.x = self.bottom_left_corner.x + col_index
             position.y = self.bottom_left_corner.y + (n - 1) - row_index
-            self.tile_matrix[row_index][col_index] = Tile(position)
+            self.tile_matrix[row_index][col_index] = Tile(position, values=values)
 
     # A method for drawing the tetromino on the game grid
     def draw(self):
@@ -87,11 +117,9 @@ class Tetromino:
             for col in range(n):
                 # draw each occupied cell as a tile on the game grid
                 if self.tile_matrix[row][col] != None:
-                    # get the position of the tile
-                    # have tiles with position.y >= grid_height
-                    position = self.tile_matrix[row][col].get_position()
+                    # have tiles with y >= grid_height
                     # draw only the tiles that are inside the game grid
-                    if position.y < self.grid_height:
+                    if self.tile_matrix[row][col].y < self.grid_height:
                         self.tile_matrix[row][col].draw()
 
     # A method for moving this tetromino in a given direction by 1 on the grid
@@ -121,104 +149,94 @@ class Tetromino:
                         self.tile_matrix[row][col].move(0, -1)
         return True  # successful move in the given direction
 
-    # Move the tetromino to the given coordinates.
+    # Drops this tetromino down as far as it can go in one move and returns the
+    # number of rows it is moved down
+    def hard_drop(self, game_grid):
+        x, y = self.bottom_left_corner.x, self.bottom_left_corner.y
+        drop_y = y
+        while self.fits(self.orientation, x, drop_y - 1, game_grid):
+            drop_y -= 1
+        if drop_y < y:
+            self.bottom_left_corner.y = drop_y
+            for row in self.tile_matrix:
+                for tile in row:
+                    if tile is not None:
+                        tile.move(0, drop_y - y)
+        return y - drop_y
+
+    # Move the tetromino to the given coordinates, that is the pivot cell of its
+    # initial orientation (see pivots) is moved to (dx, dy) in any orientation
     def move_pos(self, dx, dy):
-        # Left-most tile position
-        pivot_point = Point()
-
-        # If the leftmost object is None, check 1 unit left and bottom
-        if self.tile_matrix[0][0] != None:
-            pivot_point.x = self.tile_matrix[0][0].get_position().x
-            pivot_point.y = self.tile_matrix[0][0].get_position().y
-        # If the leftmost object is None, check 1 bottom
-        elif self.tile_matrix[0][1] != None:
-            pivot_point.x = self.tile_matrix[0][1].get_position().x
-            pivot_point.y = self.tile_matrix[0][1].get_position().y
-        # If the leftmost object is None, check 1 right
-        else:
-            pivot_point.x = self.tile_matrix[1][0].get_position().x
-            pivot_point.y = self.tile_matrix[1][0].get_position().y
+        pivot_x, pivot_y = pivots[self.type]
+        shift_x = dx - (self.bottom_left_corner.x + pivot_x)
+        shift_y = dy - (self.bottom_left_corner.y + pivot_y)
 
-        # Shifts each cells.
+        # Shifts the bottom left cell and each cells.
+        self.bottom_left_corner.translate(shift_x, shift_y)
         for m in self.tile_matrix:
             for p in m:
                 if p != None:
-                    p.move(dx-pivot_point.x, dy-pivot_point.y)
+                    p.move(shift_x, shift_y)
 
-    # Rotate tetrominos in the way clockwise
-    def rotation(self, game_grid, current_tetromino):
+    # Rotate tetrominos in the way clockwise, shifting the tetromino by the
+    # first wall kick with which it stays inside the game grid without
+    # overlapping the locked tiles (it is not rotated if there is none)
+    def rotation(self, game_grid):
         n = len(self.tile_matrix)
-        copy_matrix = np.copy(self.tile_matrix)
-        for r in range(n):
-            for c in range(n):
-                self.tile_matrix[c][n - 1 - r] = copy_matrix[r][c]
-        for r in range(n):
-            for c in range(n):
-                # If there is a tile
-                if self.tile_matrix[r][c] is not None:
-                    # Move tile their pos.
-                    self.tile_matrix[r][c].move(-r + c, -c + (n - r))
-                    if self.tile_matrix[r][c].get_position().x < 0:
-                        for i in range(0-self.tile_matrix[r][c].get_position().x):
-                            current_tetromino.move("right", game_grid)
-                    elif self.tile_matrix[r][c].get_position().x >= 12:
-                        for i in range(self.tile_matrix[r][c].get_position().x-11):
-                            current_tetromino.move("left", game_grid)
+        type_orientations = orientations[self.type]
+        cells = type_orientations[self.orientation][0]
+        new_orientation = (self.orientation + 1) % 4
+        new_cells, new_offsets = type_orientations[new_orientation][:2]
+        x, y = self.bottom_left_corner.x, self.bottom_left_corner.y
+        for dx, dy in kicks[self.type]:
+            if self.fits(new_orientation, x + dx, y + dy, game_grid):
+                break
+        else:
+            return False  # the tetromino cannot be rotated
+        self.bottom_left_corner.x, self.bottom_left_corner.y = x + dx, y + dy
+        # move each tile to its cell in the new orientation
+        tiles = [self.tile_matrix[row][col] for col, row in cells]
+        self.tile_matrix = np.full((n, n), None)
+        for tile, (col, row), (offset_x, offset_y) in zip(tiles, new_cells, new_offsets):
+            self.tile_matrix[row][col] = tile
+            tile.set_position(Point(x + dx + offset_x, y + dy + offset_y), copy=False)
+        self.orientation = new_orientation
+        return True
 
     # A method for checking if this tetromino can be moved in a given direction
     def can_be_moved(self, dir, game_grid):
-        n = len(self.tile_matrix)  # n = number of rows = number of columns
-        # check for moving left or right
-        if dir == "left" or dir == "right":
-            for row in range(n):
-                for col in range(n):
-                    # direction = left --> check the leftmost tile of each row
-                    if dir == "left" and self.tile_matrix[row][col] != None:
-                        # the position of the leftmost tile of the current row
-                        leftmost = self.tile_matrix[row][col].get_position()
-                        # if any leftmost tile is at x = 0
-                        if leftmost.x == 0:
-                            return False
-                        # skip each row whose leftmost tile is out of the game grid
-                        # (possible for newly entered tetrominoes to the game grid)
-                        if leftmost.y >= self.grid_height:
-                            break
-                        # tetromino cannot go left if the grid cell on the left of any
-                        # of its leftmost tiles is occupied
-                        if game_grid.is_occupied(leftmost.y, leftmost.x - 1):
-                            return False
-                        break  # end the inner for loop
-                    # direction = right --> check the rightmost tile of each row
-                    elif dir == "right" and self.tile_matrix[row][n - 1 - col] != None:
-                        rightmost = self.tile_matrix[row][n - 1 - col].get_position()
-                        # tetromino cannot go right if any of its rightmost tiles is
-                        # at x = grid_width - 1
-                        if rightmost.x == self.grid_width - 1:
-                            return False
-                        # skip each row whose rightmost tile is out of the game grid
-                        # (possible for newly entered tetrominoes to the game grid)
-                        if rightmost.y >= self.grid_height:
-                            break
-                        # tetromino cannot go right if the grid cell on the right of
-                        # any of its rightmost tiles is occupied
-                        if game_grid.is_occupied(rightmost.y, rightmost.x + 1):
-                            return False
-                        break  # end the inner for loop
-        # direction = down --> check the bottommost tile of each column
-        else:
-            for col in range(n):
-                for row in range(n - 1, -1, -1):
-                    if self.tile_matrix[row][col] != None:
-                        bottommost = self.tile_matrix[row][col].get_position()
-                        # skip each column whose bottommost tile is out of the grid
-                        # (possible for newly entered tetrominoes to the game grid)
-                        if bottommost.y > self.grid_height:
-                            break
-                        # tetromino cannot go down if any bottommost tile is at y = 0
-                        if bottommost.y == 0:
-                            return False
-                            # or the grid cell below any bottommost tile is occupied
-                        if game_grid.is_occupied(bottommost.y - 1, bottommost.x):
-                            return False
-                        break  # end the inner for loop
-        return True  # tetromino can be moved in the given direction
+        # the change of position in x and y directions for the given direction
+        if dir == "left":
+            dx, dy = -1, 0
+        elif dir == "right":
+            dx, dy = 1, 0
+        else:  # down
+            dx, dy = 0, -1
+        return self.fits(self.orientation, self.bottom_left_corner.x + dx,
+                         self.bottom_left_corner.y + dy, game_grid)
+
+    # Returns whether this tetromino in the given orientation with the bottom
+    # left cell of its tile matrix at (x, y) is inside the game grid (it can be
+    # above the game grid) and does not overlap the tiles on the game grid
+    def fits(self, orientation, x, y, game_grid):
+        return piece_fits(self.type, orientation, x, y, self.grid_width,
+                          game_grid.row_bits)
+
+
+# Returns whether a tetromino of the given type in the given orientation with
+# the bottom left cell of its tile matrix at (x, y) is inside a grid of the
+# given width (it can be above the grid) and does not overlap the occupied
+# cells given as the bits of each row (see GameGrid.row_bits)
+def piece_fits(type, orientation, x, y, grid_width, row_bits):
+    masks, (min_dx, max_dx, min_dy) = orientations[type][orientation][2:]
+    # tetromino cannot leave the game grid from the left, the right or the
+    # bottom
+    if x + min_dx < 0 or x + max_dx >= grid_width or y + min_dy < 0:
+        return False
+    # check the cells of the tetromino as bits of the rows of the game grid
+    # (the rows above the game grid are empty)
+    for dy in range(len(masks)):
+        row = y + dy
+        if masks[dy] and row < len(row_bits) and row_bits[row] & (masks[dy] << (x + min_dx)):
+            return False
+    return True
@@ -1,40 +1,65 @@
 import lib.stddraw as stddraw # used for drawing the tiles to display them
 from lib.color import Color # used for coloring the tiles
 from point import Point
+from tile_values import TileValues # used for the numbers of the new tiles
 import copy as cp
 import math
-import numpy as np
 
 # A class for modeling numbered tiles as in 2048
 class Tile:
    # Class variables shared among all Tile objects
    # ---------------------------------------------------------------------------
+   # the attributes of each tile (no per-tile __dict__ to keep the tiles small)
+   __slots__ = ("number", "background_color", "position")
    # the value of the boundary thickness (for the boxes around the tiles)
    boundary_thickness = 0.004
    # font family and size used for displaying the tile number
    font_family, font_size = "Arial", 14
+   # the background colors of the tiles with the numbers 2, 4, 8, ... (the
+   # numbers above the last color share the last color)
+   colors = (Color(239, 230, 221), Color(239, 227, 205), Color(247, 178, 123),
+             Color(247, 150, 99), Color(247, 124, 90), Color(247, 93, 59),
+             Color(239, 205, 115), Color(239, 206, 99), Color(239, 198, 82),
+             Color(238, 198, 66), Color(239, 194, 49), Color(60, 58, 51))
+   # the foreground (number) and the boundary (box) colors of the tiles
+   foreground_color = Color(0, 100, 200)
+   boundary_color = Color(0, 100, 200)
+   # the source of the random numbers (2 or 4) of the new tiles
+   values = TileValues()
 
-   # A constructor that creates a tile with 2 as the number on it
-   def __init__(self, position = Point(0, 0)): # (0, 0) is the default position
+   # A constructor that creates a tile with the given number on it (a random
+   # number 2 or 4 taken from values, or from Tile.values if values is None,
+   # if number is None)
+   def __init__(self, position = Point(0, 0), number = None, values = None): # (0, 0) is the default position
       # The random number of the tile 2 or 4 the inital tiles.
-      numbers = [2, 4]
-      # Sets a background colors with an array.
-      self.colors = [Color(239, 230, 221), Color(239, 227, 205), Color(247,178,123), Color(247,150,99), Color(247,124,90),
-                Color(247,93,59), Color(239,205,115), Color(239,206,99), Color(239,198,82), Color(238,198,66), Color(239,194,49), Color(60,58,51)]
-      self.num = int(np.random.choice(numbers, 1))
-      self.number = self.num
-      # set the colors of this tile
-      self.background_color = self.colors[int(math.log2(self.num))-1] # background (tile) color
-      self.foreground_color = Color(0, 100, 200) # foreground (number) color
-      self.boundary_color = Color(0, 100, 200) # boundary (box) color
+      if number is None:
+         if values is None:
+            values = Tile.values
+         number = values.next_value()
+      self.number = number
+      # set the background (tile) color of this tile
+      self.background_color = self.color_of(self.number)
 
       self.position = Point(position.x, position.y)
 
-   def set_position(self, position):
-      self.position = cp.copy(position)
+   # Sets the position of this tile to a copy of the given position, or to the
+   # given position itself when copy is False
+   def set_position(self, position, copy=True):
+      self.position = cp.copy(position) if copy else position
 
-   def get_position(self):
-      return cp.copy(self.position)
+   # Returns the position of this tile, which must not be changed unless a
+   # copy of it is asked for (copy=True)
+   def get_position(self, copy=False):
+      return cp.copy(self.position) if copy else self.position
+
+   # The x and the y coordinates of the position of this tile (read-only)
+   @property
+   def x(self):
+      return self.position.x
+
+   @property
+   def y(self):
+      return self.position.y
 
    def move(self, dx, dy):
       self.position.translate(dx, dy)
@@ -43,20 +68,32 @@ class Tile:
    def draw(self, position = None):
       if position is None:
           position = self.position
+      # the tiles with the same number look the same, so each number is drawn
+      # once as a sprite that is then copied onto the canvas
+      stddraw.sprite(("tile", self.number), position.x, position.y, 1, 1,
+                     self.draw_sprite)
+
+   # A method for drawing this tile centered at (0, 0) for its sprite
+   def draw_sprite(self):
       # draw the tile as a filled square
       stddraw.setPenColor(self.background_color)
-      stddraw.filledSquare(self.position.x, self.position.y, 0.5)
+      stddraw.filledSquare(0, 0, 0.5)
       # draw the bounding box around the tile as a square
       stddraw.setPenColor(self.boundary_color)
       stddraw.setPenRadius(Tile.boundary_thickness)
-      stddraw.square(self.position.x, self.position.y, 0.5)
+      stddraw.square(0, 0, 0.5)
       stddraw.setPenRadius()  # reset the pen radius to its default value
       # draw the number on the tile
       stddraw.setPenColor(self.foreground_color)
       stddraw.setFontFamily(Tile.font_family)
       stddraw.setFontSize(Tile.font_size)
-      stddraw.boldText(self.position.x, self.position.y, str(self.number))
+      stddraw.boldText(0, 0, str(self.number))
+
+   # Returns the background color for the given number, the numbers above
+   # the last color share the last color
+   def color_of(self, num):
+      return self.colors[min(int(math.log2(num)), len(self.colors)) - 1]
 
    # Update color according to the number they have.
    def updateColor(self, num):
-      self.background_color = self.colors[int(math.log2(num)) - 1]
\ No newline at end of file
+      self.background_color = self.color_of(num)
\ No newline at end of file
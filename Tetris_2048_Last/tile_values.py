@@ -0,0 +1,27 @@
+import numpy as np  # fundamental Python module for scientific computing
+
+
+# A class for giving out the random numbers (2 or 4) of the new tiles, the
+# numbers are drawn in large blocks from a seedable numpy random generator and
+# handed out one by one, so creating a tile needs no numpy call
+class TileValues:
+    # A constructor for drawing the numbers with the given probability of a 4
+    # (the others are 2) from the given generator or from a new generator with
+    # the given seed (a random seed if it is None), block_size numbers at once
+    def __init__(self, four_probability=0.5, seed=None, generator=None,
+                 block_size=1024):
+        if generator is None:
+            generator = np.random.default_rng(seed)
+        self.generator = generator
+        self.four_probability = four_probability
+        self.block_size = block_size
+        # the numbers drawn but not handed out yet (the last one is the next)
+        self.block = []
+
+    # Returns the number of the next new tile
+    def next_value(self):
+        if len(self.block) == 0:
+            fours = self.generator.random(self.block_size) < self.four_probability
+            # reversed so that the numbers are handed out in the drawn order
+            self.block = np.where(fours, 4, 2)[::-1].tolist()
+        return self.block.pop()
@@ -0,0 +1,36 @@
+import functools  # used for creating the keys of each grid size once
+import numpy as np  # fundamental Python module for scientific computing
+
+# the number of different values a cell can have (the log2 of the numbers
+# on the tiles, 0 for the empty cells)
+n_values = 256
+# the seed of the keys, so that the same board has the same hash in every run
+seed = 2048
+
+
+# Returns the random 64-bit keys of the cells of a game grid with the given
+# size as a (height, width, n_values) array, where keys[row, col, value] is
+# the key of the cell in the given row and column having the given value (the
+# key of an empty cell, value 0, is 0)
+@functools.lru_cache(maxsize=None)
+def zobrist_keys(height, width):
+    generator = np.random.default_rng(seed)
+    keys = generator.integers(0, 2 ** 64, size=(height, width, n_values),
+                              dtype=np.uint64, endpoint=False)
+    keys[:, :, 0] = 0
+    keys.setflags(write=False)
+    return keys
+
+
+# Returns the hash of the given value plane (see GameGrid.value_plane), that
+# is the XOR of the keys of all its cells, as an integer
+def board_hash(value_plane):
+    height, width = value_plane.shape
+    keys = zobrist_keys(height, width)
+    rows, cols = np.nonzero(value_plane)
+    return xor_keys(keys[rows, cols, value_plane[rows, cols]])
+
+
+# Returns the XOR of the given keys (an array) as an integer
+def xor_keys(keys):
+    return int(np.bitwise_xor.reduce(keys, initial=np.uint64(0)))